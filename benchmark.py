@@ -0,0 +1,210 @@
+import argparse
+import importlib
+import json
+import math
+import os
+import random
+import signal
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Benchmark suite for the algorithms in eightpuzzle.py and eightqueens.py.
+# Every (instance, algorithm) pair is an independent job with its own seeded random number
+# generators, so the jobs can be spread over a process pool and still give the same results
+# (final states, successes and fails) for any number of workers. The suite reports the success
+# rate and min/median/p95 run time of every algorithm, can save its report as JSON and can
+# compare it against a saved baseline report to flag slowdowns.
+#
+#   python benchmark.py --trials 1000 --output report.json
+#   python benchmark.py --baseline report.json
+
+# Benchmarks of the suite: module with benchmark_problem(rng) and ALGORITHMS, and summary title
+SUITE = {
+    'eightpuzzle': ('eightpuzzle', "Out of {} random solvable 8-puzzles"),
+    'queens': ('eightqueens', "Out of {} random 8-queens"),
+}
+
+# A success rate this much (absolute) below the baseline's is flagged as a regression
+SUCCESS_TOLERANCE = 0.05
+
+class RunTimeout(Exception):
+    """ Raised inside a job when it runs longer than its timeout """
+
+def instance_seed(seed, trial):
+    """ Seed of the random number generator that builds the instance of a trial """
+    return '{}:{}'.format(seed, trial)
+
+def algorithm_seed(seed, trial, name):
+    """ Seed of the random number generator used by one algorithm on one trial """
+    return '{}:{}:{}'.format(seed, trial, name)
+
+def raise_timeout(signum, frame):
+    raise RunTimeout()
+
+def run_job(job):
+    """ Build the instance of a trial, run one algorithm on it and return
+    (trial, name, final state, success, time taken, timed out). Timeouts use SIGALRM,
+    so they are ignored on platforms without it """
+    make_problem, name, algorithm, seed, trial, timeout = job
+    problem = make_problem(random.Random(instance_seed(seed, trial)))
+    problem.rng = random.Random(algorithm_seed(seed, trial, name))
+    use_alarm = timeout and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    timed_out = False
+    start = time.perf_counter()
+    try:
+        # The alarm can also go off just after the algorithm returned, before it is switched off
+        try:
+            state = algorithm(problem)
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except RunTimeout:
+        state = problem.initial
+        timed_out = True
+    elapsed = time.perf_counter() - start
+    if use_alarm:
+        signal.signal(signal.SIGALRM, previous)
+
+    return trial, name, state, not timed_out and problem.goal_test(state), elapsed, timed_out
+
+def run_benchmark(make_problem, algorithms, trials=100, seed=0, workers=None, warmup=0, timeout=None):
+    """ Run every (name, algorithm) pair in algorithms on trials instances and return the
+    per-job results, ordered by trial and then algorithm. make_problem(rng) must build a fresh
+    problem for an instance drawn from rng; both it and the algorithms have to be module level
+    functions (or functools.partial objects) so that they can be sent to worker processes.
+    warmup extra trials per algorithm are run first and left out of the results, and runs longer
+    than timeout seconds are stopped and count as fails. With workers=1 the jobs run in this process """
+    jobs = [(make_problem, name, algorithm, seed, trial, timeout)
+            for trial in range(-warmup, trials) for name, algorithm in algorithms]
+
+    if workers == 1:
+        results = [run_job(job) for job in jobs]
+    else:
+        workers = workers or os.cpu_count() or 1
+        # Large chunks keep the inter-process traffic low on runs with thousands of instances
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_job, jobs, chunksize=chunksize))
+    return [result for result in results if result[0] >= 0]
+
+def percentile(times, p):
+    """ Nearest-rank percentile of a sorted list """
+    return times[max(0, math.ceil(p / 100 * len(times)) - 1)]
+
+def summarize(results, algorithms):
+    """ Merge per-job results into per-algorithm statistics: successes, fails, timeouts,
+    success rate and the total, min, median and p95 run time in seconds """
+    runs = {name: [] for name, _ in algorithms}
+    for _, name, _, success, elapsed, timed_out in results:
+        runs[name].append((success, elapsed, timed_out))
+
+    summary = {}
+    for name, outcomes in runs.items():
+        times = sorted(elapsed for _, elapsed, _ in outcomes)
+        successes = sum(success for success, _, _ in outcomes)
+        summary[name] = {
+            'runs': len(outcomes),
+            'successes': successes,
+            'fails': len(outcomes) - successes,
+            'timeouts': sum(timed_out for _, _, timed_out in outcomes),
+            'success_rate': successes / len(outcomes) if outcomes else 0.0,
+            'total': sum(times),
+            'min': times[0] if times else 0.0,
+            'median': statistics.median(times) if times else 0.0,
+            'p95': percentile(times, 95) if times else 0.0,
+        }
+    return summary
+
+def print_summary(title, summary):
+    print(title)
+    for i, (name, stats) in enumerate(summary.items()):
+        print(('\n' if i else '') + name)
+        print("     Successes:", stats['successes'])
+        print("     Fails:", stats['fails'])
+        if stats['timeouts']:
+            print("     Timeouts:", stats['timeouts'])
+        print("     Time Taken:", stats['total'])
+        print("     Success Rate: {:.1%}".format(stats['success_rate']))
+        print("     Min / Median / P95: {:.6f} / {:.6f} / {:.6f}".format(stats['min'], stats['median'], stats['p95']))
+
+def compare(report, baseline, tolerance=0.1):
+    """ Return a message for every algorithm whose median or p95 time is more than tolerance
+    (a fraction) slower than in the baseline report, or whose success rate dropped by more
+    than SUCCESS_TOLERANCE """
+    regressions = []
+    for problem, summary in report['results'].items():
+        for name, stats in summary.items():
+            old = baseline.get('results', {}).get(problem, {}).get(name)
+            if old is None:
+                continue
+            for key in ('median', 'p95'):
+                if old[key] > 0 and stats[key] > old[key] * (1 + tolerance):
+                    regressions.append('{} / {}: {} time {:.6f}s -> {:.6f}s (+{:.0%})'.format(
+                        problem, name, key, old[key], stats[key], stats[key] / old[key] - 1))
+            if stats['success_rate'] < old['success_rate'] - SUCCESS_TOLERANCE:
+                regressions.append('{} / {}: success rate {:.1%} -> {:.1%}'.format(
+                    problem, name, old['success_rate'], stats['success_rate']))
+    return regressions
+
+def run_suite(problems, trials=100, seed=0, workers=None, warmup=0, timeout=None, verbose=True):
+    """ Run the benchmarks of the given SUITE entries and return the report """
+    report = {'config': {'trials': trials, 'seed': seed, 'warmup': warmup, 'timeout': timeout},
+              'results': {}}
+    for i, problem in enumerate(problems):
+        module_name, title = SUITE[problem]
+        module = importlib.import_module(module_name)
+        results = run_benchmark(module.benchmark_problem, module.ALGORITHMS, trials, seed, workers, warmup, timeout)
+        summary = summarize(results, module.ALGORITHMS)
+        report['results'][problem] = summary
+        if verbose:
+            print_summary(('\n' if i else '') + title.format(trials), summary)
+    return report
+
+def add_arguments(parser):
+    parser.add_argument('--problem', choices=sorted(SUITE) + ['all'], default='all', help='benchmark to run')
+    parser.add_argument('--trials', type=int, default=100, help='number of random instances')
+    parser.add_argument('--seed', type=int, default=0, help='base seed of all random number generators')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--warmup', type=int, default=0, help='unmeasured trials per algorithm run first')
+    parser.add_argument('--timeout', type=float, default=None, help='seconds after which a run counts as a fail')
+    parser.add_argument('--output', help='save the report as JSON to this file')
+    parser.add_argument('--baseline', help='JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='fraction by which median or p95 times may exceed the baseline (default 0.1)')
+
+def run(args):
+    """ Run the suite for parsed arguments and return the exit status: 1 if there are regressions """
+    problems = sorted(SUITE) if args.problem == 'all' else [args.problem]
+    report = run_suite(problems, args.trials, args.seed, args.workers, args.warmup, args.timeout)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(report, json.load(f), args.tolerance)
+    print('\nCompared to', args.baseline + ':')
+    for message in regressions:
+        print('     REGRESSION', message)
+    if not regressions:
+        print('     no regressions')
+    return 1 if regressions else 0
+
+def main(argv=None, problem=None):
+    """ Command line entry point. problem sets the default --problem, e.g. when the suite
+    is started from eightpuzzle.py """
+    parser = argparse.ArgumentParser(description='Benchmark the local search algorithms')
+    add_arguments(parser)
+    if problem:
+        parser.set_defaults(problem=problem)
+    sys.exit(run(parser.parse_args(argv)))
+
+if __name__ == '__main__':
+    main()
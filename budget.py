@@ -0,0 +1,89 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Deadlines, iteration budgets and cancellation for the local search algorithms.
+# Every solver takes a budget argument; when it's None (the default) the solvers run exactly as
+# before. Given a Budget, a solver calls budget.step() once per iteration of its main loop and,
+# as soon as it returns True, stops and returns the best state it has found so far instead of
+# running to the end of its restarts or schedule.
+#
+#   token = CancellationToken()
+#   state = simulated_annealing(problem, budget=Budget(timeout=0.05, token=token))
+#
+# solve_async runs a solver in an executor so that an asyncio service can serve many requests
+# at once, each with its own time limit.
+
+class CancellationToken:
+    """ Flag that tells running solvers to stop. event can be any object with set() and is_set(),
+    e.g. a multiprocessing Event to cancel solvers running in other processes """
+
+    def __init__(self, event=None):
+        self.event = threading.Event() if event is None else event
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+class Budget:
+    """ Limits of one solver run.
+    timeout: seconds from the creation of the budget; deadline: a time.monotonic() time.
+        If both are given the earlier one is used
+    max_iterations: number of iterations of the solver's main loop (one hill climbing step,
+        annealing proposal or min-conflicts repair)
+    token: CancellationToken checked on every iteration
+    After the run, iterations is the number of iterations done and stopped is the reason the
+    budget stopped the solver ('deadline', 'iterations' or 'cancelled'), or None """
+
+    def __init__(self, timeout=None, max_iterations=None, token=None, deadline=None):
+        if timeout is not None:
+            deadline = time.monotonic() + timeout if deadline is None else min(deadline, time.monotonic() + timeout)
+        self.deadline = deadline
+        self.max_iterations = max_iterations
+        self.token = token
+        self.iterations = 0
+        self.stopped = None
+
+    def remaining(self):
+        """ Seconds left before the deadline, or None if there is no deadline """
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def step(self):
+        """ Count one iteration and return True if the solver has to stop before doing it """
+        if self.max_iterations is not None and self.iterations >= self.max_iterations:
+            self.stopped = 'iterations'
+        elif self.token is not None and self.token.cancelled:
+            self.stopped = 'cancelled'
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            self.stopped = 'deadline'
+        else:
+            self.iterations += 1
+            return False
+        return True
+
+async def solve_async(solver, problem, *args, timeout=None, max_iterations=None, token=None, executor=None,
+                      **kwargs):
+    """ Run solver(problem, *args, budget=..., **kwargs) in executor (default: the event loop's
+    default thread pool) and return its final state. When timeout or max_iterations runs out the
+    solver returns the best state it found, so awaiting this never takes much longer than timeout.
+    If the awaiting task is cancelled (e.g. by asyncio.wait_for) the solver is told to stop too,
+    so that it doesn't keep a worker busy. Solvers in a ProcessPoolExecutor can't see the token,
+    so there they are only stopped by the timeout and max_iterations """
+    if isinstance(executor, ProcessPoolExecutor):
+        token = None
+    elif token is None:
+        token = CancellationToken()
+    budget = Budget(timeout, max_iterations, token)
+    future = asyncio.get_running_loop().run_in_executor(
+        executor, functools.partial(solver, problem, *args, budget=budget, **kwargs))
+    try:
+        return await future
+    except asyncio.CancelledError:
+        if token is not None:
+            token.cancel()
+        raise
@@ -0,0 +1,148 @@
+import mmap
+import os
+import random
+import sys
+import tempfile
+
+import eightpuzzle
+
+# Exact distance table for the eight puzzle.
+# One breadth-first search backwards from the goal finds the true number of moves from every one of
+# the 181,440 solvable states. Each state is mapped to a unique index (blank position * 8!/2 plus
+# half the Lehmer rank of the other tiles), so the table is a flat array of one byte per state.
+# It is saved to a file and read through mmap, so looking a state up costs no search and loading
+# the table costs almost nothing.
+
+GOAL = (0, 1, 2, 3, 4, 5, 6, 7, 8)
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'eightpuzzle_distances.bin')
+MAGIC = b'8PZD'
+HEADER_SIZE = len(MAGIC) + 9
+HALF_RANKS = 20160  # 8! / 2
+UNREACHED = 255
+
+FACTORIALS = [5040, 720, 120, 24, 6, 2, 1, 1]
+
+def index(state, order):
+    """ Return the table index of a state, or None if the state can't reach the goal.
+    order is the eightpuzzle.tile_order of the goal """
+    tiles = [order[tile] for tile in state if tile != 0]
+    rank = 0
+    parity = 0
+    for i in range(7):
+        smaller = 0
+        for j in range(i + 1, 8):
+            if tiles[j] < tiles[i]:
+                smaller += 1
+        rank += smaller * FACTORIALS[i]
+        parity += smaller
+    # On a 3x3 board a state can reach the goal exactly when its tiles are an even permutation of
+    # the goal's tiles. Swapping the last two tiles changes the rank by one and flips the parity,
+    # so rank // 2 numbers the even permutations without gaps.
+    if parity % 2:
+        return None
+    return state.index(0) * HALF_RANKS + rank // 2
+
+def build(goal=GOAL):
+    """ Run a breadth-first search back from the goal and return the bytearray of distances """
+    order = eightpuzzle.tile_order(goal)
+    distances = bytearray([UNREACHED]) * (9 * HALF_RANKS)
+    distances[index(goal, order)] = 0
+    frontier = [goal]
+    depth = 0
+
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for state in frontier:
+            blank = state.index(0)
+            for neighbor in eightpuzzle.MOVES[blank].values():
+                new_state = list(state)
+                new_state[blank], new_state[neighbor] = new_state[neighbor], 0
+                new_state = tuple(new_state)
+                i = index(new_state, order)
+                if distances[i] == UNREACHED:
+                    distances[i] = depth
+                    next_frontier.append(new_state)
+        frontier = next_frontier
+
+    return distances
+
+def save(distances, goal=GOAL, path=DEFAULT_PATH):
+    """ Write a table built by build(goal) to path. It's written to a temporary file next to
+    path that then replaces it, so a reader never maps a partly written table """
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        # mkstemp makes the file readable by its owner only
+        os.chmod(temporary, 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC + bytes(goal) + distances)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+class DistanceTable:
+    """ Memory-mapped exact distance table for one goal state. If path doesn't exist the
+    table is built and saved there first """
+
+    def __init__(self, path=DEFAULT_PATH, goal=GOAL):
+        if not os.path.exists(path):
+            save(build(goal), goal, path)
+        with open(path, 'rb') as f:
+            self.table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.table[:len(MAGIC)] != MAGIC or len(self.table) != HEADER_SIZE + 9 * HALF_RANKS:
+            raise ValueError('{} is not an eight puzzle distance table'.format(path))
+        if tuple(self.table[len(MAGIC):HEADER_SIZE]) != tuple(goal):
+            raise ValueError('{} was built for the goal {}'.format(path, tuple(self.table[len(MAGIC):HEADER_SIZE])))
+        self.goal = tuple(goal)
+        self.order = eightpuzzle.tile_order(goal)
+
+    def close(self):
+        self.table.close()
+
+    def distance(self, state):
+        """ Return the length of an optimal solution of state, or None if it has none """
+        i = index(state, self.order)
+        if i is None:
+            return None
+        return self.table[HEADER_SIZE + i]
+
+    def solve(self, state):
+        """ Return an optimal list of actions that take state to the goal, or None if there is none.
+        Since the table is exact, a greedy walk that always moves to a neighbor one step closer
+        is an optimal A* search that never expands a wrong node """
+        distance = self.distance(state)
+        if distance is None:
+            return None
+
+        actions = []
+        while distance > 0:
+            blank = state.index(0)
+            for action, neighbor in eightpuzzle.MOVES[blank].items():
+                new_state = list(state)
+                new_state[blank], new_state[neighbor] = new_state[neighbor], 0
+                new_state = tuple(new_state)
+                if self.distance(new_state) == distance - 1:
+                    break
+            actions.append(action)
+            state = new_state
+            distance -= 1
+        return actions
+
+# Eight puzzle whose heuristic is the true distance to the goal, e.g. to compare the hill climbing
+# algorithms against ground truth. Unsolvable states get a distance larger than any real one.
+class ExactEightPuzzle(eightpuzzle.EightPuzzle):
+
+    def __init__(self, initial, goal=GOAL, rng=random, table=None):
+        super().__init__(initial, goal, rng)
+        self.table = table or DistanceTable(goal=goal)
+
+    def h(self, node):
+        distance = self.table.distance(node.state)
+        return UNREACHED if distance is None else distance
+
+# Build the table for the default goal and save it, optionally to the path given as argument
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    save(build(), GOAL, path)
+    print('Saved the distances of', 9 * HALF_RANKS, 'states to', path)
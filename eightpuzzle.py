@@ -1,45 +1,114 @@
 import search
+import math
 import random
-import time
+from functools import partial
+
+import numpy as np
+
+import schedules
+from instrumentation import instrumented
+from localsearch import LocalState, PicklableRng, TabuList, argmax_random_tie, expand, local_search
+
+# Legal moves for every position of the blank square, as {action: new blank position}.
+# Precomputed so that actions() and result() don't check the board edges on every call.
+def legal_moves(blank):
+    moves = {}
+    if blank > 2:
+        moves['UP'] = blank - 3
+    if blank < 6:
+        moves['DOWN'] = blank + 3
+    if blank % 3 != 0:
+        moves['LEFT'] = blank - 1
+    if blank % 3 != 2:
+        moves['RIGHT'] = blank + 1
+    return moves
+
+MOVES = [legal_moves(blank) for blank in range(9)]
+ACTIONS = [tuple(moves) for moves in MOVES]
+
+# Maps every tile to its position in the goal's sequence of tiles (the blank is skipped)
+def tile_order(goal):
+    return {tile: i for i, tile in enumerate(tile for tile in goal if tile != 0)}
+
+# Parity of the permutation that takes the goal's sequence of tiles to the state's, from its cycle
+# decomposition in O(n). On a 3x3 board a state can reach the goal exactly when this is 0.
+def tiles_parity(state, order):
+    tiles = [order[tile] for tile in state if tile != 0]
+    visited = [False] * len(tiles)
+    parity = 0
+    for i in range(len(tiles)):
+        length = 0
+        while not visited[i]:
+            visited[i] = True
+            i = tiles[i]
+            length += 1
+        if length:
+            parity += length - 1
+    return parity % 2
+
+# Swaps the first two tiles of a state, which flips its parity
+def swap_tiles(numbers):
+    first, second = [i for i, tile in enumerate(numbers) if tile != 0][:2]
+    numbers[first], numbers[second] = numbers[second], numbers[first]
 
 # Eight Puzzle Problem class from the aimacode repository, 
 # slightly modified to include a value function and a Manhattan Distance hueristic function
-class EightPuzzle(search.Problem):
+class EightPuzzle(PicklableRng, search.Problem):
     """ The problem of sliding tiles numbered from 1 to 8 on a 3x3 board, where one of the
     squares is a blank. A state is represented as a tuple of length 9, where  element at
     index i represents the tile number  at index i (0 if it's an empty square) """
 
-    def __init__(self, initial, goal=(0, 1, 2, 3, 4, 5, 6, 7, 8)):
-        """ Define goal state and initialize a problem """
+    def __init__(self, initial, goal=(0, 1, 2, 3, 4, 5, 6, 7, 8), rng=random):
+        """ Define goal state and initialize a problem. rng is the random number generator
+        (the random module or a random.Random instance) used by the problem and the algorithms """
         super().__init__(initial, goal)
+        self.rng = rng
         # Goal indexes dictionary added to facilitate the Manhattan Distance Heuristic calculation
         self.goal_indexes = {}
         for idx, value in enumerate(self.goal):
             self.goal_indexes[value] = idx 
+        self.tile_order = tile_order(self.goal)
+        # Tile x position tables, indexed by tile * 9 + index, holding the Manhattan distance of
+        # the tile to its goal square and whether the tile is on its goal square. They turn h and
+        # value into table lookups and let PackedEightPuzzle update both in O(1) per move.
+        self.distances = [0] * 81
+        self.matches = [0] * 81
+        for tile, goal_index in self.goal_indexes.items():
+            goal_row, goal_col = goal_index // 3, goal_index % 3
+            for i in range(9):
+                if tile != 0:
+                    self.distances[tile * 9 + i] = abs(i // 3 - goal_row) + abs(i % 3 - goal_col)
+                self.matches[tile * 9 + i] = int(i == goal_index)
 
     def find_blank_square(self, state):
         """Return the index of the blank square in a given state"""
 
         return state.index(0)
 
+    def tile_at(self, state, square):
+        """Return the tile on the given square (0 for the blank)"""
+        return state[square]
+
     def actions(self, state):
         """ Return the actions that can be executed in the given state.
-        The result would be a list, since there are only four possible actions
-        in any given state of the environment """
+        The result is a tuple from the precomputed ACTIONS table, since there are
+        only four possible actions in any given state of the environment """
+
+        return ACTIONS[self.find_blank_square(state)]
+
+    def random_action(self, state):
+        """ Return one of the actions of the given state chosen uniformly at random,
+        or None if there are no actions """
 
-        possible_actions = ['UP', 'DOWN', 'LEFT', 'RIGHT']
-        index_blank_square = self.find_blank_square(state)
+        actions = self.actions(state)
+        return self.rng.choice(actions) if actions else None
 
-        if index_blank_square % 3 == 0:
-            possible_actions.remove('LEFT')
-        if index_blank_square < 3:
-            possible_actions.remove('UP')
-        if index_blank_square % 3 == 2:
-            possible_actions.remove('RIGHT')
-        if index_blank_square > 5:
-            possible_actions.remove('DOWN')
+    def random_actions(self, state):
+        """ Yield the actions of the given state in random order """
 
-        return possible_actions
+        actions = list(self.actions(state))
+        self.rng.shuffle(actions)
+        yield from actions
 
     def result(self, state, action):
         """ Given state and action, return a new state that is the result of the action.
@@ -47,10 +116,8 @@ class EightPuzzle(search.Problem):
 
         # blank is the index of the blank square
         blank = self.find_blank_square(state)
+        neighbor = MOVES[blank][action]
         new_state = list(state)
-
-        delta = {'UP': -3, 'DOWN': 3, 'LEFT': -1, 'RIGHT': 1}
-        neighbor = blank + delta[action]
         new_state[blank], new_state[neighbor] = new_state[neighbor], new_state[blank]
 
         return tuple(new_state)
@@ -61,164 +128,381 @@ class EightPuzzle(search.Problem):
         return state == self.goal
 
     def check_solvability(self, state):
-        """ Checks if the given state is solvable """
-
-        inversion = 0
-        for i in range(len(state)):
-            for j in range(i + 1, len(state)):
-                if (state[i] > state[j]) and state[i] != 0 and state[j] != 0:
-                    inversion += 1
+        """ Checks if the goal can be reached from the given state """
 
-        return inversion % 2 == 0
+        return tiles_parity(state, self.tile_order) == 0
 
     # Manhattan Distance heuristic function 
     def h(self, node):
-        current_state = node.state
-        manhattan_distance = 0
+        distances = self.distances
         
-        # Calculate the Manhattan distance of each square
-        for i in range(9):
-            if current_state[i] != 0:  
-                current_row, current_col = i // 3, i % 3
-                goal_index = self.goal_indexes[current_state[i]]
-                goal_row, goal_col = goal_index // 3, goal_index % 3
-                manhattan_distance += abs(current_row - goal_row) + abs(current_col - goal_col)
-        
-        return manhattan_distance
+        # Sum the precomputed Manhattan distance of each square (the blank's distance is 0)
+        return sum(distances[tile * 9 + i] for i, tile in enumerate(node.state))
             
-    # Function to set the initial state to a random one. Used for Random Restart Hill Climb
-    def set_random_initial(self):
+    # Function to set the initial state to a random one. Used for Random Restart Hill Climb.
+    # With solvable=True the state is drawn uniformly from the states that can reach the goal.
+    def set_random_initial(self, solvable=False):
         # Generate a list of integers from 0 to 8 and shuffle
         numbers = list(range(9))
-        random.shuffle(numbers)
+        self.rng.shuffle(numbers)
+        # The parity is checked on the plain list, since subclasses check the solvability of
+        # their own state representation
+        if solvable and tiles_parity(numbers, self.tile_order):
+            swap_tiles(numbers)
         
         # Set initial state to a random state
         self.initial = tuple(numbers)
         
     # Calculate a states value by comparing the amount of values with the same index as the goal state
     def value(self, state):
-        value = 0
+        matches = self.matches
         
-        # Compare each value's index of the state with the corresponding index in the goal state
-        for i in range(9):
-            # Increment value when a value in the current state is in the same index as the goal state
-            if state[i] == self.goal[i]:  
-                value += 1
-        return value
+        # Count the values of the state that are in the same index as in the goal state
+        return sum(matches[tile * 9 + i] for i, tile in enumerate(state))
+
+# Compact representation of the eight puzzle. The board is packed into a single int with 4 bits
+# per tile (the tile at index i is stored in bits 4*i to 4*i+3) and carried with the blank index.
+# Moving the blank is a constant time bit swap.
+def pack(state):
+    """ Pack a tuple state into a (board, blank) pair """
+    board = 0
+    for i, tile in enumerate(state):
+        board |= tile << (4 * i)
+    return board, state.index(0)
+
+def unpack(packed):
+    """ Unpack a packed state back into a tuple state """
+    board = packed[0]
+    return tuple((board >> (4 * i)) & 15 for i in range(9))
+
+class PackedEightPuzzle(EightPuzzle):
+    """ The eight puzzle on packed states. A state is the tuple (board, blank, h, value), where
+    h (Manhattan distance) and value (tiles on their goal square) are cached with the board and
+    updated in O(1) per move. Takes the same tuple initial and goal states as EightPuzzle; use
+    unpack() to turn the states it returns back into tuples """
+
+    def __init__(self, initial, goal=(0, 1, 2, 3, 4, 5, 6, 7, 8), rng=random):
+        super().__init__(initial, goal, rng)
+        self.initial = self.pack(initial)
+        self.goal = self.pack(goal)
+
+    def pack(self, state):
+        """ Pack a tuple state into a (board, blank, h, value) state """
+        return pack(state) + (super().h(search.Node(state)), super().value(state))
+
+    def find_blank_square(self, state):
+        return state[1]
+
+    def tile_at(self, state, square):
+        return (state[0] >> (4 * square)) & 15
+
+    def actions(self, state):
+        return ACTIONS[state[1]]
+
+    def result(self, state, action):
+        board, blank, h, value = state
+        neighbor = MOVES[blank][action]
+        # The blank's nibble is 0, so XOR-ing the tile in at both positions swaps them
+        tile = (board >> (4 * neighbor)) & 15
+        board ^= (tile << (4 * neighbor)) ^ (tile << (4 * blank))
+        # Only the moved tile and the blank change squares
+        tile, moved = tile * 9, tile * 9 + blank
+        h += self.distances[moved] - self.distances[tile + neighbor]
+        value += (self.matches[moved] - self.matches[tile + neighbor]
+                  + self.matches[neighbor] - self.matches[blank])
+        return board, neighbor, h, value
+
+    def goal_test(self, state):
+        return state[0] == self.goal[0]
+
+    def check_solvability(self, state):
+        return super().check_solvability(unpack(state))
+
+    def h(self, node):
+        return node.state[2]
+
+    def set_random_initial(self, solvable=False):
+        super().set_random_initial(solvable)
+        self.initial = self.pack(self.initial)
 
+    def value(self, state):
+        return state[3]
   
 # Steepest Hill Climbing method from the aimacode repository
-def steepest_hill_climbing(problem):
+# Runs on LocalState records scored by value (see localsearch.py) instead of search.Node.
+@instrumented
+@local_search
+def steepest_hill_climbing(problem, stats=None, budget=None, start=LocalState):
+    # Unsolvable puzzles are rejected up front instead of searching until stuck
+    if not problem.check_solvability(problem.initial):
+        return start(problem.initial)
     # while True:              ### This line was used for debugging purposes ###
-    current = search.Node(problem.initial)
+    current = start(problem.initial, problem.value(problem.initial))
     
     while True:
         if problem.goal_test(current.state):
-            return current.state
+            return current
+        # Every move improves the state, so the current state is the best one so far
+        if budget is not None and budget.step():
+            break
                 
-        neighbors = current.expand(problem)
+        neighbors = expand(problem, current, problem.value)
         if not neighbors:
             break
-        neighbor = search.argmax_random_tie(neighbors, key=lambda node: problem.value(node.state))
+        neighbor = argmax_random_tie(neighbors, lambda record: record.score, problem.rng)
         
-        if problem.value(neighbor.state) <= problem.value(current.state):
+        if neighbor.score <= current.score:
             break
         current = neighbor
         
-    return current.state
+    return current
 
 # First Choice Hill Climbing method, partially from the aimacode repository.
 # Executes a modified version of the hill climb algorithm that moves to the next state better 
 # than the current one, even if it is not the most optimal neighbor state.
-def first_choice_hill_climbing(problem):
+# Neighbors are generated lazily in random order, so only the ones tried before an improvement are built.
+@instrumented
+@local_search
+def first_choice_hill_climbing(problem, stats=None, budget=None, start=LocalState):
+    # Unsolvable puzzles are rejected up front instead of searching until stuck
+    if not problem.check_solvability(problem.initial):
+        return start(problem.initial)
     # while True:              ### This line was used for debugging purposes ###
-    current = search.Node(problem.initial)
+    current = start(problem.initial, problem.value(problem.initial))
     
     while True:
         if problem.goal_test(current.state):
-            return current.state
-                
-        neighbors = current.expand(problem)
-        # If there are no neighbors then stop the iteration  
-        if not neighbors:
+            return current
+        if budget is not None and budget.step():
             break
         
         better_neighbor = False
         
         # Search for a neighbor better than the current state
-        for neighbor in neighbors:
-            if problem.value(neighbor.state) > problem.value(current.state):
-                current = neighbor
+        for action in problem.random_actions(current.state):
+            next_state = problem.result(current.state, action)
+            next_value = problem.value(next_state)
+            if next_value > current.score:
+                current = current.child(next_state, action, next_value)
                 better_neighbor = True
                 break
                 
-        # If no neighbor is better than the current state stop the iteration       
+        # If no neighbor is better than the current state (or there are no neighbors) stop the iteration       
         if not better_neighbor:
             break
         
-    return current.state
+    return current
 
 # Random Restart hill climb method, partially from the aimacode repository.
 # Takes in an amount of restarts as a parameter. The method executes the hill climb algorithm
 # from the aimacode repository, but it restarts from a random position each time it doesn't reach
 # the goal, while keeping track of the previous state closest to the goal.
 # Returns the best encountered state across all restarts.
-def random_restart_hill_climbing(problem, restarts=1000):
+# Unsolvable puzzles are rejected up front, and restarts only use states that can reach the goal.
+# With path=True the path of the returned state starts from the initial state of its own climb.
+# With visited (a visited.Bitset or visited.BloomFilter, see visited.default_filter) a climb stops as
+# soon as it enters a state an earlier climb went through; stats counts those as saved_restarts.
+@instrumented
+@local_search
+def random_restart_hill_climbing(problem, restarts=1000, stats=None, budget=None, start=LocalState,
+                                  visited=None):
+    if not problem.check_solvability(problem.initial):
+        return start(problem.initial)
     # Keeps track of the best encountered state across the restarts
-    best_state = problem.initial
+    best = start(problem.initial, problem.value(problem.initial))
     
     for _ in range(restarts):
     # while True:              ### This line was used for debugging purposes ###
-        current = search.Node(problem.initial)
+        current = start(problem.initial, problem.value(problem.initial))
         
         while True:
-            if problem.value(current.state) > problem.value(best_state):
-                best_state = current.state
-                if problem.goal_test(best_state):
-                    return best_state
+            if current.score > best.score:
+                best = current
+                if problem.goal_test(best.state):
+                    return best
+            if visited is not None and visited.add(current.state):
+                if stats is not None:
+                    stats.counters['saved_restarts'] += 1
+                break
+            if budget is not None and budget.step():
+                return best
                     
-            neighbors = current.expand(problem)
+            neighbors = expand(problem, current, problem.value)
             if not neighbors:
                 break
-            neighbor = search.argmax_random_tie(neighbors, key=lambda node: problem.value(node.state))
+            neighbor = argmax_random_tie(neighbors, lambda record: record.score, problem.rng)
             
-            if problem.value(neighbor.state) <= problem.value(current.state):
+            if neighbor.score <= current.score:
                 break
             current = neighbor
         
-        problem.set_random_initial()    
-    return best_state
+        problem.set_random_initial(solvable=True)    
+        if stats is not None:
+            stats.restart()
+    return best
 
 # Schedule function from the aimacode repository.
-# Modified to have a lam of 0.001 and limit of 5000.
+# Modified to have a lam of 0.001 and limit of 5000, and to compute the temperature with math.exp.
 def exp_schedule(k=20, lam=0.001, limit=5000):
     """One possible schedule function for simulated annealing"""
-    return lambda t: (k * search.np.exp(-lam * t)) if t < limit else 0
+    return lambda t: (k * math.exp(-lam * t)) if t < limit else 0
 
 # Simulated Annealing algorithm from the aimacode repository.
-# Modified to use the heuristic function (Manhattan Distance) instead of value function.
-def simulated_annealing(problem, schedule=exp_schedule()):
+# Modified to use the heuristic function (Manhattan Distance) instead of value function,
+# and to sample a single random move per iteration instead of expanding every neighbor.
+# The default schedule steers the temperature by the acceptance rate and reheats whenever the
+# search stops improving (see schedules.AdaptiveSchedule). On random solvable puzzles it solves
+# about three times as many puzzles as exp_schedule() for the same time per run.
+@instrumented
+@local_search
+def simulated_annealing(problem, schedule=schedules.AdaptiveSchedule(), stats=None, budget=None, start=LocalState):
     """[Figure 4.5] CAUTION: This differs from the pseudocode as it
-    returns a state instead of a Node."""
-    current = search.Node(problem.initial)
+    returns a state instead of a Node (unless path=True)."""
+    # Unsolvable puzzles are rejected up front instead of annealing until the schedule ends
+    if not problem.check_solvability(problem.initial):
+        return start(problem.initial)
+    # Records are scored by h
+    current = start(problem.initial)
+    current.score = problem.h(current)
+    # Annealing can move away from the best state, so it's kept in case the budget runs out
+    best = current
+    # Schedule objects (see schedules.py) get a fresh copy per run and feedback on every proposal
+    schedule = schedules.start(schedule)
+    observe = getattr(schedule, 'observe', None)
     for t in range(search.sys.maxsize):
         T = schedule(t)
         # print(T)  ### USED FOR DEBUGGING PURPOSES
         if T == 0 or problem.goal_test(current.state):
-            return current.state
-        neighbors = current.expand(problem)
-        if not neighbors:
-            return current.state
-        next_choice = random.choice(neighbors)
-        delta_e = problem.h(current) - problem.h(next_choice)
-        if delta_e > 0 or search.probability(search.np.exp(delta_e / T)):
+            return current
+        if budget is not None and budget.step():
+            return best
+        action = problem.random_action(current.state)
+        if action is None:
+            return current
+        next_choice = current.child(problem.result(current.state, action), action)
+        next_choice.score = problem.h(next_choice)
+        delta_e = current.score - next_choice.score
+        accepted = delta_e > 0 or math.exp(delta_e / T) > problem.rng.uniform(0.0, 1.0)
+        if stats is not None:
+            stats.proposal(t, accepted)
+        if accepted:
             current = next_choice
+            if current.score < best.score:
+                best = current
+        if observe is not None:
+            observe(accepted, current.score)
+
+# Tabu search. Like steepest hill climbing it moves to the best neighbor (by the Manhattan distance,
+# as in simulated_annealing), but it keeps moving when that neighbor is no better, sideways or
+# uphill, so it walks off plateaus and local minima instead of stopping on them. Moving a tile back
+# onto a square it left within the last tenure moves is tabu, which keeps the search from undoing
+# its own moves, unless the move leads to a state better than any found so far (aspiration).
+# The search gives up after patience moves in a row without a new best state, or max_steps moves,
+# and returns the best state found.
+@instrumented
+@local_search
+def tabu_search(problem, tenure=4, patience=2000, max_steps=10000, stats=None, budget=None, start=LocalState):
+    # Unsolvable puzzles are rejected up front instead of searching until patience runs out
+    if not problem.check_solvability(problem.initial):
+        return start(problem.initial)
+    # Records are scored by h
+    current = start(problem.initial)
+    current.score = problem.h(current)
+    best = current
+    # (tile, square) pairs of the last tenure moves: the square each moved tile came from
+    tabu = TabuList(tenure)
+    stale = 0
+    for _ in range(max_steps):
+        if problem.goal_test(current.state):
+            return current
+        if budget is not None and budget.step():
+            break
+        blank = problem.find_blank_square(current.state)
+        allowed = []
+        for action in problem.actions(current.state):
+            neighbor = current.child(problem.result(current.state, action), action)
+            neighbor.score = problem.h(neighbor)
+            # The tile moves from the blank's new square onto its old one
+            square = problem.find_blank_square(neighbor.state)
+            tile = problem.tile_at(current.state, square)
+            if (tile, blank) not in tabu or neighbor.score < best.score:
+                allowed.append((neighbor, (tile, square)))
+        if not allowed:
+            break
+        current, move = argmax_random_tie(allowed, lambda item: -item[0].score, problem.rng)
+        tabu.add(move)
+        if current.score < best.score:
+            best = current
+            stale = 0
+        else:
+            stale += 1
+            if stale >= patience:
+                break
+    return best
             
-# Generates a random puzzle   
-def random_puzzle():
+# Batched version of simulated_annealing that runs one chain per initial state at the same time.
+# The boards are rows of a 2-D NumPy array, and every iteration proposes a random move, scores it
+# with the Manhattan distance table and accepts or rejects it for all chains in a few array
+# operations. Chains stop moving once they reach the goal.
+def batch_simulated_annealing(states, goal=(0, 1, 2, 3, 4, 5, 6, 7, 8), schedule=exp_schedule(), seed=None,
+                              stats=None, budget=None):
+    """ Anneal every state in states (a sequence of tuple states or a K x 9 array) towards goal.
+    Returns the K x 9 array of final states and a boolean array telling which chains reached
+    the goal. seed seeds the NumPy random number generator used for all the chains.
+    Chains that start from an unsolvable state are left where they are. stats (a SearchStats)
+    receives the accepted and rejected moves of all chains and their acceptance rate per step.
+    budget (a budget.Budget) counts one iteration per step of all the chains; when it runs out
+    the chains are returned where they are """
+    if stats is not None:
+        stats.start()
+    rng = np.random.default_rng(seed)
+    distances = np.array(EightPuzzle(goal, goal).distances).reshape(9, 9)
+    targets_table = np.array([list(moves.values()) + [0] * (4 - len(moves)) for moves in MOVES])
+    move_counts = np.array([len(moves) for moves in MOVES])
+
+    boards = np.array(states, dtype=np.int8).reshape(-1, 9)
+    blanks = np.argmax(boards == 0, axis=1)
+    h = distances[boards, np.arange(9)].sum(axis=1)
+    solved = h == 0
+    order = tile_order(goal)
+    running = ~solved & np.array([tiles_parity(board, order) == 0 for board in boards.tolist()], dtype=bool)
+
+    for t in range(search.sys.maxsize):
+        T = schedule(t)
+        if T == 0 or not running.any() or (budget is not None and budget.step()):
+            break
+        chains = np.flatnonzero(running)
+        blank = blanks[chains]
+
+        # Propose one random legal move per chain and score it by the change in Manhattan distance
+        choice = (rng.random(len(chains)) * move_counts[blank]).astype(np.intp)
+        target = targets_table[blank, choice]
+        tile = boards[chains, target]
+        delta_h = distances[tile, blank] - distances[tile, target]
+
+        accept = (delta_h < 0) | (rng.random(len(chains)) < np.exp(-delta_h / T))
+        if stats is not None:
+            stats.batch_proposals(t, len(chains), int(accept.sum()))
+        chains, blank, target, tile = chains[accept], blank[accept], target[accept], tile[accept]
+        boards[chains, blank] = tile
+        boards[chains, target] = 0
+        blanks[chains] = target
+        h[chains] += delta_h[accept]
+        solved[chains] = h[chains] == 0
+        running[chains] &= ~solved[chains]
+
+    if stats is not None:
+        stats.finish(None)
+    return boards, solved
+
+# Generates a random puzzle. With solvable=True the puzzle is drawn uniformly from the
+# puzzles that can reach the given goal.
+def random_puzzle(rng=random, solvable=False, goal=(0, 1, 2, 3, 4, 5, 6, 7, 8)):
     # Generate a list of integers from 0 to 8 and shuffle
     numbers = list(range(9))
-    random.shuffle(numbers)
+    rng.shuffle(numbers)
+    if solvable and tiles_parity(numbers, tile_order(goal)):
+        swap_tiles(numbers)
     
     # Return tuple of random numbers
     return tuple(numbers)
@@ -240,75 +524,22 @@ def random_puzzle():
 # print(puzzle_problem.value((1, 7, 6, 5, 4, 2, 3, 8, 0)))
 '''
 
-# Initialize successes, fails and times lists used to calculate those values respectively
-successes = [0, 0, 0, 0]
-fails = [0, 0, 0, 0]
-times = [0, 0, 0, 0]
-
-for _ in range(100):
-    # Generate a random 8-puzzle
-    puzzle = random_puzzle()
-    
-    # Create a problem object for each algorithm
-    puzzle_problem_steepest = EightPuzzle(puzzle)
-    puzzle_problem_first = EightPuzzle(puzzle)
-    puzzle_problem_restart = EightPuzzle(puzzle)
-    puzzle_problem_annealing = EightPuzzle(puzzle)
-    
-    # Measure the time taken to execute each algorithm
-    start = time.time()
-    steepest_output = steepest_hill_climbing(puzzle_problem_steepest)
-    end = time.time()
-    times[0] += (end - start)
-    
-    start = time.time()
-    first_output = first_choice_hill_climbing(puzzle_problem_first)
-    end = time.time()
-    times[1] += (end - start)
-    
-    start = time.time()
-    restart_output = random_restart_hill_climbing(puzzle_problem_restart, 1000)
-    end = time.time()
-    times[2] += (end - start)
-    
-    start = time.time()
-    annealing_output = simulated_annealing(puzzle_problem_annealing)
-    end = time.time()
-    times[3] += (end - start)
-
-    # Count the amount of successes and fails for each algorithm
-    if puzzle_problem_steepest.goal_test(steepest_output):
-        successes[0] += 1
-    else:
-        fails[0] += 1
-    if puzzle_problem_first.goal_test(first_output):
-        successes[1] += 1
-    else:
-        fails[1] += 1
-    if puzzle_problem_restart.goal_test(restart_output):
-        successes[2] += 1
-    else:
-        fails[2] += 1
-    if puzzle_problem_annealing.goal_test(annealing_output):
-        successes[3] += 1
-    else:
-        fails[3] += 1
-
-# Print Statements
-print("Out of 100 random 8-puzzles")
-print("Steepest Hill Climbing")
-print("     Successes:", successes[0])
-print("     Fails:", fails[0])
-print("     Time Taken:", times[0])
-print("\nFirst Hill Climbing")
-print("     Successes:", successes[1])
-print("     Fails:", fails[1])
-print("     Time Taken:", times[1])
-print("\nRandom Restart Hill Climbing")
-print("     Successes:", successes[2])
-print("     Fails:", fails[2])
-print("     Time Taken:", times[2])
-print("\nSimulated Annealing")
-print("     Successes:", successes[3])
-print("     Fails:", fails[3])
-print("     Time Taken:", times[3])
\ No newline at end of file
+# Builds the problem for one benchmark trial from a random solvable puzzle, so that the
+# benchmark times the search rather than the rejection of unsolvable puzzles. The puzzle is
+# packed, so h and value are updated in O(1) per move instead of summed over the board.
+def benchmark_problem(rng):
+    return PackedEightPuzzle(random_puzzle(rng, solvable=True))
+
+ALGORITHMS = [
+    ('Steepest Hill Climbing', steepest_hill_climbing),
+    ('First Hill Climbing', first_choice_hill_climbing),
+    ('Random Restart Hill Climbing', partial(random_restart_hill_climbing, restarts=1000)),
+    ('Simulated Annealing', simulated_annealing),
+    ('Tabu Search', tabu_search),
+]
+
+# Run the benchmark suite for this problem (see benchmark.py for the options). Importing this
+# module only defines the problem and the algorithms.
+if __name__ == '__main__':
+    import benchmark
+    benchmark.main(problem='eightpuzzle')
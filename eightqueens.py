@@ -1,10 +1,19 @@
 import search
+import math
 import random
-import time
+from array import array
+from collections import Counter
+from functools import partial
+
+import numpy as np
+
+import schedules
+from instrumentation import instrumented
+from localsearch import LocalState, PicklableRng, TabuList, argmax_random_tie, local_search
 
 # N Queens Problem class from the aimacode.
 # Modified to use 8 as the default N and work with hill climb algorithms.
-class NQueensProblem(search.Problem):
+class NQueensProblem(PicklableRng, search.Problem):
     """The problem of placing N queens on an NxN board with none attacking
     each other. A state is represented as an N-element array, where
     a value of r in the c-th entry means there is a queen at column c,
@@ -14,19 +23,91 @@ class NQueensProblem(search.Problem):
     <Node (7, 3, 0, 2, 5, 1, 6, 4)>
     """
 
-    def __init__(self, N=8):
-        super().__init__(tuple([-1] * 8))
+    def __init__(self, N=8, rng=random):
+        super().__init__(tuple([-1] * N))
         self.N = N
+        # Random number generator used by the problem and the algorithms (the random module
+        # or a random.Random instance)
+        self.rng = rng
+        # Row, diagonal and anti-diagonal occupancy counters of the tracked state (see track)
+        self.tracked = None
+        self.tracked_h = 0
+        self.rows = Counter()
+        self.diagonals = Counter()
+        self.anti_diagonals = Counter()
+
+    def __copy__(self):
+        """Copies get their own occupancy counters, so that moves made on a copy (e.g. by a
+        parallel worker) don't change the counters of this problem"""
+        other = type(self).__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        other.tracked = None
+        other.tracked_h = 0
+        other.rows = Counter()
+        other.diagonals = Counter()
+        other.anti_diagonals = Counter()
+        return other
+
+    # Added so that h, delta and actions don't have to compare every pair of queens.
+    # Only one state is tracked at a time, normally the current state of a hill climb.
+    def track(self, state):
+        """Rebuild the occupancy counters for the given state"""
+        self.rows = Counter(state)
+        self.diagonals = Counter(r - c for c, r in enumerate(state))
+        self.anti_diagonals = Counter(r + c for c, r in enumerate(state))
+        self.tracked_h = self.count_conflicts(self.rows, self.diagonals, self.anti_diagonals)
+        self.tracked = state
+
+    def count_conflicts(self, *counters):
+        """Return the number of conflicting (ordered) queen pairs on the given lines"""
+        return sum(n * (n - 1) for counter in counters for n in counter.values())
+
+    def move_square(self, state, action):
+        """Return the (column, row) square the moved queen ends up on"""
+        if isinstance(action, int):
+            return state.index(-1), action
+        return action
+
+    def delta(self, state, action):
+        """Return h(result(state, action)) - h(state) in O(1) using the occupancy counters"""
+        if state is not self.tracked:
+            self.track(state)
+        c, r = self.move_square(state, action)
+        old = state[c]
+        if r == old:
+            return 0
+        # Lines the queen leaves lose one conflict per other queen on them, lines it joins gain one
+        removed = (self.rows[old] + self.diagonals[old - c] + self.anti_diagonals[old + c]) - 3
+        added = self.rows[r] + self.diagonals[r - c] + self.anti_diagonals[r + c]
+        return 2 * (added - removed)
+
+    def move(self, state, action):
+        """Return result(state, action), updating the occupancy counters in O(1)
+        if state is the tracked state"""
+        new_state = self.result(state, action)
+        if state is self.tracked:
+            c, r = self.move_square(state, action)
+            old = state[c]
+            self.tracked_h += self.delta(state, action)
+            self.rows[old] -= 1
+            self.diagonals[old - c] -= 1
+            self.anti_diagonals[old + c] -= 1
+            self.rows[r] += 1
+            self.diagonals[r - c] += 1
+            self.anti_diagonals[r + c] += 1
+            self.tracked = new_state
+        return new_state
 
     # Modified to be compatible with hill climb algorithms
     def actions(self, state):
         """In the leftmost empty column, try all non-conflicting rows."""
         if state[-1] != -1:
-            actions = []
-            for c in range(self.N):
-                for r in range(self.N):
-                    if r != state[c] and not self.conflicted(state, r, c, exclude=c):
-                        actions.append((c, r))
+            # Same as checking self.conflicted(state, r, c, exclude=c), but O(1) per square
+            if state is not self.tracked:
+                self.track(state)
+            rows, diagonals, anti_diagonals = self.rows, self.diagonals, self.anti_diagonals
+            actions = [(c, r) for c in range(self.N) for r in range(self.N)
+                       if r != state[c] and not (rows[r] or diagonals[r - c] or anti_diagonals[r + c])]
         else:
             col = state.index(-1)
             actions = [row for row in range(self.N)
@@ -34,6 +115,68 @@ class NQueensProblem(search.Problem):
         
         return actions
 
+    # Added for boards with hundreds of queens: scores every move of a full board in a few array
+    # operations from the row and diagonal histograms instead of one delta call per move.
+    def move_deltas(self, state):
+        """Return the N x N array of h(result(state, (c, r))) - h(state) for moving the queen of
+        column c to row r, and the boolean N x N array of which of those moves are actions"""
+        N = self.N
+        board = np.array(state)
+        columns = np.arange(N)
+        rows = np.bincount(board, minlength=N)
+        diagonals = np.bincount(board - columns + N - 1, minlength=2 * N - 1)
+        anti_diagonals = np.bincount(board + columns, minlength=2 * N - 1)
+        # Queens on the lines of every square (c, r); the moving queen is never counted, since
+        # none of the lines of another square in its column goes through its own square
+        r, c = columns[None, :], columns[:, None]
+        added = rows[r] + diagonals[r - c + N - 1] + anti_diagonals[r + c]
+        removed = rows[board] + diagonals[board - columns + N - 1] + anti_diagonals[board + columns] - 3
+        # The actions are the squares no queen attacks, which also rules out the queen's own square
+        return 2 * (added - removed[:, None]), added == 0
+
+    def best_move(self, state):
+        """Return the action of a full board with the lowest delta, ties broken uniformly at
+        random, together with its delta, or None if there are no actions"""
+        deltas, legal = self.move_deltas(state)
+        if not legal.any():
+            return None
+        deltas = np.where(legal, deltas, np.iinfo(deltas.dtype).max)
+        candidates = np.flatnonzero(deltas == deltas.min())
+        i = int(candidates[self.rng.randrange(len(candidates))])
+        return divmod(i, self.N), int(deltas.flat[i])
+
+    def legal_move(self, state, c, r):
+        """Would moving the queen of column c to row r be one of the actions of a full board?"""
+        if state is not self.tracked:
+            self.track(state)
+        return r != state[c] and not (self.rows[r] or self.diagonals[r - c] or self.anti_diagonals[r + c])
+
+    def random_action(self, state):
+        """Return one of the actions of the given state chosen uniformly at random,
+        or None if there are no actions"""
+        if state[-1] != -1:
+            # Rejection sampling finds a move in O(1) expected time unless legal moves are rare,
+            # in which case we fall back to listing them
+            for _ in range(self.N):
+                c, r = self.rng.randrange(self.N), self.rng.randrange(self.N)
+                if self.legal_move(state, c, r):
+                    return c, r
+        actions = self.actions(state)
+        return self.rng.choice(actions) if actions else None
+
+    def random_actions(self, state):
+        """Yield the actions of the given state in random order. Moves are generated on
+        demand, so stopping after the first few costs O(1) per move instead of O(N^2)"""
+        if state[-1] == -1:
+            actions = self.actions(state)
+            self.rng.shuffle(actions)
+            yield from actions
+            return
+        for i in lazy_shuffle(self.N * self.N, self.rng):
+            c, r = divmod(i, self.N)
+            if self.legal_move(state, c, r):
+                yield c, r
+
     # Modified to be compatible with hill climb algorithms
     def result(self, state, action):
         """Place the next queen at the given row."""
@@ -63,18 +206,18 @@ class NQueensProblem(search.Problem):
         """Check if all columns filled, no conflicts."""
         if state[-1] == -1:
             return False
-        return not any(self.conflicted(state, state[col], col)
-                       for col in range(len(state)))
+        if state is not self.tracked:
+            self.track(state)
+        return self.tracked_h == 0 and not self.rows[-1]
 
     def h(self, node):
         """Return number of conflicting queens for a given node"""
-        num_conflicts = 0
-        for (r1, c1) in enumerate(node.state):
-            for (r2, c2) in enumerate(node.state):
-                if (r1, c1) != (r2, c2):
-                    num_conflicts += self.conflict(r1, c1, r2, c2)
-
-        return num_conflicts
+        if node.state is self.tracked:
+            return self.tracked_h
+        state = node.state
+        return self.count_conflicts(Counter(state),
+                                    Counter(r - c for c, r in enumerate(state)),
+                                    Counter(r + c for c, r in enumerate(state)))
     
     # Use the already implemented heuristic function for the Queens problem in the aimacode repository
     def value(self, node):
@@ -85,117 +228,441 @@ class NQueensProblem(search.Problem):
         # Generate a list of random integers from 0 to 7
         numbers = []
         for _ in range(self.N):
-            numbers.append(random.randint(0, self.N-1))
+            numbers.append(self.rng.randint(0, self.N-1))
         
         # Set initial state to a random state
         self.initial = tuple(numbers)
     
-# Steepest Hill Climbing method from the aimacode repository
-def steepest_hill_climbing(problem):
+# Yields the numbers 0 to n-1 in random order. This is a Fisher-Yates shuffle that only stores
+# the positions it has swapped, so each number costs O(1) and nothing is built up front.
+def lazy_shuffle(n, rng=random):
+    swapped = {}
+    for i in range(n):
+        j = rng.randrange(i, n)
+        current = swapped.pop(i, i)
+        if j == i:
+            yield current
+        else:
+            yield swapped.get(j, j)
+            swapped[j] = current
+
+# Boards with at least this many queens score their moves with NQueensProblem.best_move. On smaller
+# boards the NumPy call overhead costs more than scoring the few legal moves one by one.
+VECTORIZED_N = 10
+
+# Returns the steepest move of a state as (action, delta), with ties broken at random,
+# or None if the state has no actions
+def steepest_move(problem, state):
+    if problem.N >= VECTORIZED_N and state[-1] != -1:
+        return problem.best_move(state)
+    actions = problem.actions(state)
+    if not actions:
+        return None
+    action = argmax_random_tie(actions, lambda a: -problem.delta(state, a), problem.rng)
+    return action, problem.delta(state, action)
+
+# Steepest Hill Climbing method from the aimacode repository.
+# Modified to score moves with problem.delta (all at once with NumPy on larger boards, see
+# steepest_move) instead of calling h on every neighbor, and to run on LocalState records (see
+# localsearch.py) instead of search.Node. Moves go through problem.move, which moves the
+# problem's occupancy counters along with the state.
+@instrumented
+@local_search
+def steepest_hill_climbing(problem, stats=None, budget=None, start=LocalState):
     # while True:              ### This line was used for debugging purposes ###
-    current = search.Node(problem.initial)
+    current = start(problem.initial)
     
     while True:
         if problem.goal_test(current.state):
-            return current.state
+            return current
+        # Every move improves the state, so the current state is the best one so far
+        if budget is not None and budget.step():
+            break
                 
-        neighbors = current.expand(problem)
-        if not neighbors:
+        move = steepest_move(problem, current.state)
+        if move is None:
             break
-        neighbor = search.argmax_random_tie(neighbors, key=lambda node: problem.value(node))
+        action, delta = move
         
-        if problem.value(neighbor) >= problem.value(current):
+        if delta >= 0:
             break
-        current = neighbor
+        current = current.child(problem.move(current.state, action), action)
 
-    return current.state
+    return current
 
 # First Choice Hill Climbing method, partially from the aimacode repository.
 # Executes a modified version of the hill climb algorithm that moves to the next state better 
 # than the current one, even if it is not the most optimal neighbor state.
-def first_choice_hill_climbing(problem):
+# Moves are generated lazily in random order, so only the ones tried before an improvement are scored.
+@instrumented
+@local_search
+def first_choice_hill_climbing(problem, stats=None, budget=None, start=LocalState):
     
     # while True:              ### This line was used for debugging purposes ###
-    current = search.Node(problem.initial)
+    current = start(problem.initial)
     
     while True:
         if problem.goal_test(current.state):
-            return current.state
-                
-        neighbors = current.expand(problem)
-        # If there are no neighbors then stop the iteration  
-        if not neighbors:
+            return current
+        if budget is not None and budget.step():
             break
         
         better_neighbor = False
         
         # Search for a neighbor better than the current state
-        for neighbor in neighbors:
-            if problem.value(neighbor) < problem.value(current):
-                current = neighbor
+        for action in problem.random_actions(current.state):
+            if problem.delta(current.state, action) < 0:
+                current = current.child(problem.move(current.state, action), action)
                 better_neighbor = True
                 break
                 
-        # If no neighbor is better than the current state stop the iteration       
+        # If no neighbor is better than the current state (or there are no neighbors) stop the iteration       
         if not better_neighbor:
             break
         
-    return current.state
+    return current
 
 # Random Restart hill climb method, partially from the aimacode repository.
 # Takes in an amount of restarts as a parameter. The method executes the hill climb algorithm
 # from the aimacode repository, but it restarts from a random position each time it doesn't reach
 # the goal, while keeping track of the previous state closest to the goal. 
 # Returns the best encountered state across all restarts.
-def random_restart_hill_climbing(problem, restarts):
+# With path=True the path of the returned state starts from the initial state of its own climb.
+# With visited (a visited.Bitset or visited.BloomFilter, see visited.default_filter) a climb stops as
+# soon as it enters a state an earlier climb went through; stats counts those as saved_restarts.
+@instrumented
+@local_search
+def random_restart_hill_climbing(problem, restarts, stats=None, budget=None, start=LocalState, visited=None):
     # Keeps track of the best encountered state across the restarts
-    best_state = search.Node(problem.initial)
+    best_state = start(problem.initial)
+    best_value = problem.value(best_state)
     
     for _ in range(restarts):
     # while True:              ### USED FOR DEBUGGING PURPOSES ###
-        current = search.Node(problem.initial)
+        current = start(problem.initial)
         
         while True:
-            if problem.value(current) < problem.value(best_state):
+            if problem.value(current) < best_value:
                 best_state = current
+                best_value = problem.value(current)
                 if problem.goal_test(best_state.state):
-                    return best_state.state
+                    return best_state
+            if visited is not None and visited.add(current.state):
+                if stats is not None:
+                    stats.counters['saved_restarts'] += 1
+                break
+            if budget is not None and budget.step():
+                return best_state
                     
-            neighbors = current.expand(problem)
-            if not neighbors:
+            move = steepest_move(problem, current.state)
+            if move is None:
                 break
-            neighbor = search.argmax_random_tie(neighbors, key=lambda node: problem.value(node))
+            action, delta = move
             
-            if problem.value(neighbor) >= problem.value(current):
+            if delta >= 0:
                 break
-            current = neighbor
+            current = current.child(problem.move(current.state, action), action)
         
         problem.set_random_initial()    
-    return best_state.state
+        if stats is not None:
+            stats.restart()
+    return best_state
 
 # Schedule function from the aimacode repository.
-# Modified to have a lam of 0.001 and limit of 5000.
+# Modified to have a lam of 0.001 and limit of 5000, and to compute the temperature with math.exp.
 def exp_schedule(k=20, lam=0.001, limit=5000):
     """One possible schedule function for simulated annealing"""
-    return lambda t: (k * search.np.exp(-lam * t)) if t < limit else 0
+    return lambda t: (k * math.exp(-lam * t)) if t < limit else 0
 
-# Simulated Annealing algorithm from the aimacode repository
-def simulated_annealing(problem, schedule=exp_schedule()):
+# Simulated Annealing algorithm from the aimacode repository.
+# Modified to minimize conflicts: delta_e is the decrease in h caused by the move.
+# Samples a single random move per iteration instead of listing all N^2 moves.
+# Moves only go to squares no queen attacks, so no move makes h worse and the temperature
+# hardly matters; instead the default schedule ends the run once 50 moves in a row found
+# no better board, rather than wandering on a plateau until the schedule runs out.
+@instrumented
+@local_search
+def simulated_annealing(problem, schedule=schedules.ExponentialSchedule(patience=50), stats=None, budget=None,
+                        start=LocalState):
     """[Figure 4.5] CAUTION: This differs from the pseudocode as it
-    returns a state instead of a Node."""
-    current = search.Node(problem.initial)
+    returns a state instead of a Node (unless path=True)."""
+    current = start(problem.initial)
+    # Annealing can move away from the best full board, so it's kept in case the budget runs out
+    best, best_h = None, math.inf
+    # Schedule objects (see schedules.py) get a fresh copy per run and feedback on every proposal
+    schedule = schedules.start(schedule)
+    observe = getattr(schedule, 'observe', None)
     for t in range(search.sys.maxsize):
         T = schedule(t)
         # print(T)  ### USED FOR DEBUGGING PURPOSES
         if T == 0 or problem.goal_test(current.state):
-            return current.state
-        neighbors = current.expand(problem)
-        if not neighbors:
-            return current.state
-        next_choice = random.choice(neighbors)
-        delta_e = problem.value(next_choice) - problem.value(current)
-        if delta_e > 0 or search.probability(search.np.exp(delta_e / T)):
-            current = next_choice
+            return current
+        if budget is not None and budget.step():
+            return current if best is None else best
+        action = problem.random_action(current.state)
+        if action is None:
+            return current
+        delta_e = -problem.delta(current.state, action)
+        accepted = delta_e > 0 or math.exp(delta_e / T) > problem.rng.uniform(0.0, 1.0)
+        if stats is not None:
+            stats.proposal(t, accepted)
+        if accepted:
+            current = current.child(problem.move(current.state, action), action)
+            # h of the tracked current state is O(1)
+            if budget is not None and current.state[-1] != -1 and problem.h(current) < best_h:
+                best, best_h = current, problem.h(current)
+        if observe is not None:
+            observe(accepted, problem.h(current))
+
+# Tabu search. Every step moves a queen to the best square of its column (scored all at once by
+# problem.move_deltas), even when that doesn't lower h or raises it, so the search gets off the
+# plateaus and local minima where the hill climbers stop. Unlike the actions of a full board, any
+# other row of a column is a move here, attacked or not. Moving a queen back to a row it left
+# within the last tenure moves is tabu, unless the move leads to fewer conflicts than any board
+# found so far (aspiration). The search gives up after patience moves in a row without a new best
+# board, or max_steps moves, and returns the best board found. Empty columns of the initial state
+# first get a random row, since the moves are those of a full board.
+@instrumented
+@local_search
+def tabu_search(problem, tenure=None, patience=500, max_steps=10000, stats=None, budget=None, start=LocalState):
+    """tenure defaults to N / 2 moves"""
+    N = problem.N
+    tenure = tenure or max(1, N // 2)
+    state = problem.initial
+    if -1 in state:
+        state = tuple(problem.rng.randrange(N) if r == -1 else r for r in state)
+    current = start(state)
+    h = best_h = problem.h(current)
+    best = current
+    # (column, row) squares the last tenure moves took queens off
+    tabu = TabuList(tenure)
+    stale = 0
+    for _ in range(max_steps):
+        if h == 0:
+            return current
+        if budget is not None and budget.step():
+            break
+        deltas, _ = problem.move_deltas(current.state)
+        columns = np.arange(N)
+        # A queen's own square is no move, and tabu squares are only allowed if they beat the best
+        allowed = np.ones((N, N), dtype=bool)
+        allowed[columns, current.state] = False
+        for c, r in tabu:
+            allowed[c, r] = h + deltas[c, r] < best_h
+        if not allowed.any():
+            break
+        deltas = np.where(allowed, deltas, np.iinfo(deltas.dtype).max)
+        candidates = np.flatnonzero(deltas == deltas.min())
+        i = int(candidates[problem.rng.randrange(len(candidates))])
+        c, r = divmod(i, N)
+        tabu.add((c, current.state[c]))
+        h += int(deltas.flat[i])
+        current = current.child(problem.result(current.state, (c, r)), (c, r))
+        if h < best_h:
+            best, best_h = current, h
+            stale = 0
+        else:
+            stale += 1
+            if stale >= patience:
+                break
+    return best
+
+# Min-conflicts algorithm for large boards.
+# The board is an array('i') that is mutated in place, and the row and diagonal counters are
+# arrays as well, so memory stays linear in N. A repair step only looks at a sample of rows,
+# which lets boards with a million queens be solved in seconds.
+@instrumented
+def min_conflicts(problem, max_steps=None, samples=50, stats=None, budget=None):
+    """Repeatedly move a conflicted queen to its least conflicted row. Like the other
+    algorithms, returns the final state (as a tuple) whether or not it is a goal.
+    stats (a SearchStats) receives the number of steps and queen moves in 'steps' and 'move'.
+    budget (a budget.Budget) counts one iteration per step; a queen never moves to a more
+    conflicted row, so the board is returned as it is when the budget runs out."""
+    N = problem.N
+    if max_steps is None:
+        max_steps = max(10000, 2 * N)
+    rand = problem.rng.random
+
+    # Each line (row, diagonal r - c + N or anti-diagonal r + c) stores how many queens are on it
+    # and the XOR of their columns, so that a queen alone on a line can be found in O(1)
+    board = array('i', [0]) * N
+    rows, row_columns = array('i', [0]) * N, array('i', [0]) * N
+    diagonals, diagonal_columns = array('i', [0]) * (2 * N), array('i', [0]) * (2 * N)
+    anti_diagonals, anti_diagonal_columns = array('i', [0]) * (2 * N), array('i', [0]) * (2 * N)
+
+    def place(r, c):
+        board[c] = r
+        rows[r] += 1
+        row_columns[r] ^= c
+        diagonals[r - c + N] += 1
+        diagonal_columns[r - c + N] ^= c
+        anti_diagonals[r + c] += 1
+        anti_diagonal_columns[r + c] ^= c
+
+    if -1 not in problem.initial:
+        for c, r in enumerate(problem.initial):
+            place(r, c)
+    else:
+        # Greedy initialisation: give each column a random unused row, preferring rows whose
+        # diagonals are still free, so that only a few diagonal conflicts are left to repair
+        free = list(range(N))
+        for c in range(N):
+            best, best_conflicts = 0, N
+            for _ in range(min(samples, len(free))):
+                i = int(rand() * len(free))
+                r = free[i]
+                conflicts = diagonals[r - c + N] + anti_diagonals[r + c]
+                if conflicts < best_conflicts:
+                    best, best_conflicts = i, conflicts
+                    if not conflicts:
+                        break
+            r = free[best]
+            free[best] = free[-1]
+            free.pop()
+            place(r, c)
+
+    # Number of attacking queen pairs, kept up to date as queens move
+    pairs = sum(n * (n - 1) // 2 for counts in (rows, diagonals, anti_diagonals) for n in counts)
+    # Rows without a queen are always worth trying, since a board with N queens and no row
+    # conflicts is a permutation and random row samples would almost never hit them
+    empty_rows = {r for r in range(N) if not rows[r]}
+
+    # Conflicted columns, as a list for O(1) random picks and a flag array to avoid duplicates.
+    # Columns whose conflicts get resolved by other moves are dropped lazily when picked.
+    conflicted = [c for c in range(N)
+                  if rows[board[c]] + diagonals[board[c] - c + N] + anti_diagonals[board[c] + c] > 3]
+    listed = bytearray(N)
+    for c in conflicted:
+        listed[c] = 1
+
+    steps = moves = 0
+    for steps in range(max_steps):
+        if pairs == 0 or (budget is not None and budget.step()):
+            break
+
+        i = int(rand() * len(conflicted))
+        c = conflicted[i]
+        old = board[c]
+        if rows[old] + diagonals[old - c + N] + anti_diagonals[old + c] == 3:
+            conflicted[i] = conflicted[-1]
+            conflicted.pop()
+            listed[c] = 0
+            continue
+
+        # Lift the queen off the board and find the least conflicted row for it
+        rows[old] -= 1
+        row_columns[old] ^= c
+        diagonals[old - c + N] -= 1
+        diagonal_columns[old - c + N] ^= c
+        anti_diagonals[old + c] -= 1
+        anti_diagonal_columns[old + c] ^= c
+        if not rows[old]:
+            empty_rows.add(old)
+
+        best = old
+        best_conflicts = rows[old] + diagonals[old - c + N] + anti_diagonals[old + c]
+        pairs -= best_conflicts
+        ties = 1
+        if N <= samples:
+            candidates = range(N)
+        else:
+            candidates = [int(rand() * N) for _ in range(samples)]
+            if len(empty_rows) <= samples:
+                candidates.extend(empty_rows)
+        for r in candidates:
+            if r == old:
+                continue
+            conflicts = rows[r] + diagonals[r - c + N] + anti_diagonals[r + c]
+            if conflicts < best_conflicts:
+                best, best_conflicts, ties = r, conflicts, 1
+            elif conflicts == best_conflicts:
+                # Reservoir sampling breaks ties uniformly at random
+                ties += 1
+                if rand() * ties < 1:
+                    best = r
+
+        # A queen that was alone on one of the new lines is now conflicted as well
+        for counts, columns, j in ((rows, row_columns, best), (diagonals, diagonal_columns, best - c + N),
+                                   (anti_diagonals, anti_diagonal_columns, best + c)):
+            if counts[j] == 1 and not listed[columns[j]]:
+                listed[columns[j]] = 1
+                conflicted.append(columns[j])
+        empty_rows.discard(best)
+        place(best, c)
+        pairs += best_conflicts
+        moves += best != old
+    else:
+        steps = max_steps
+
+    if stats is not None:
+        stats.counters['steps'] += steps
+        stats.counters['move'] += moves
+    return tuple(board)
+
+# Batched version of simulated_annealing that runs one chain per initial board at the same time.
+# The boards are rows of a 2-D NumPy array with per-chain row and diagonal histograms next to them,
+# and every iteration proposes, scores and accepts or rejects a move for all chains in a few array
+# operations. Unlike simulated_annealing, a proposal is any square outside the queen's current row
+# (not just squares nobody attacks), since that set can be sampled without looking at the board.
+# Chains stop moving once they reach the goal.
+def batch_simulated_annealing(states, schedule=exp_schedule(), seed=None, stats=None, budget=None):
+    """Anneal every full board in states (a K x N array or a sequence of tuple states).
+    Returns the K x N array of final states and a boolean array telling which chains reached
+    the goal. seed seeds the NumPy random number generator used for all the chains. stats
+    (a SearchStats) receives the accepted and rejected moves of all chains and their
+    acceptance rate per step. budget (a budget.Budget) counts one iteration per step of all
+    the chains; when it runs out the chains are returned where they are"""
+    if stats is not None:
+        stats.start()
+    rng = np.random.default_rng(seed)
+    boards = np.array(states, dtype=np.intp)
+    K, N = boards.shape
+    columns = np.arange(N)
+
+    # Histograms of the queens on every row, diagonal (r - c + N - 1) and anti-diagonal (r + c)
+    def histogram(lines, size):
+        offsets = np.arange(K)[:, None] * size
+        return np.bincount((lines + offsets).ravel(), minlength=K * size).reshape(K, size)
+    rows = histogram(boards, N)
+    diagonals = histogram(boards - columns + N - 1, 2 * N - 1)
+    anti_diagonals = histogram(boards + columns, 2 * N - 1)
+    h = sum((counts * (counts - 1)).sum(axis=1) for counts in (rows, diagonals, anti_diagonals))
+    solved = h == 0
+
+    for t in range(search.sys.maxsize):
+        T = schedule(t)
+        if T == 0 or solved.all() or (budget is not None and budget.step()):
+            break
+        chains = np.flatnonzero(~solved)
+        n = len(chains)
+
+        # Propose moving the queen of a random column to a random other row
+        c = rng.integers(0, N, n)
+        old = boards[chains, c]
+        r = (old + rng.integers(1, N, n)) % N
+
+        # Same computation as NQueensProblem.delta, for all chains at once
+        removed = rows[chains, old] + diagonals[chains, old - c + N - 1] + anti_diagonals[chains, old + c] - 3
+        added = rows[chains, r] + diagonals[chains, r - c + N - 1] + anti_diagonals[chains, r + c]
+        delta_h = 2 * (added - removed)
+
+        accept = (delta_h < 0) | (rng.random(n) < np.exp(-delta_h / T))
+        if stats is not None:
+            stats.batch_proposals(t, n, int(accept.sum()))
+        chains, c, old, r = chains[accept], c[accept], old[accept], r[accept]
+        rows[chains, old] -= 1
+        diagonals[chains, old - c + N - 1] -= 1
+        anti_diagonals[chains, old + c] -= 1
+        rows[chains, r] += 1
+        diagonals[chains, r - c + N - 1] += 1
+        anti_diagonals[chains, r + c] += 1
+        boards[chains, c] = r
+        h[chains] += delta_h[accept]
+        solved[chains] = h[chains] == 0
+
+    if stats is not None:
+        stats.finish(None)
+    return boards, solved
 
 ''' USED FOR TESTING PURPOSES
 # def random_queens(length):
@@ -207,72 +674,21 @@ def simulated_annealing(problem, schedule=exp_schedule()):
 # print(random_queens(8))
 '''
 
-# Initialize successes, fails and times lists used to calculate those values respectively         
-successes = [0, 0, 0, 0]
-fails = [0, 0, 0, 0]
-times = [0, 0, 0, 0]
-
-for _ in range(100):
-    # Create a problem object for each algorithm
-    queens_problem_steepest = NQueensProblem()
-    queens_problem_first = NQueensProblem()
-    queens_problem_restart = NQueensProblem()
-    queens_problem_annealing = NQueensProblem()
-    
-    # Measure the time taken to execute each algorithm
-    start = time.time()
-    steepest_output = steepest_hill_climbing(queens_problem_steepest)
-    end = time.time()
-    times[0] += (end - start)
-    
-    start = time.time()
-    first_output = first_choice_hill_climbing(queens_problem_first)
-    end = time.time()
-    times[1] += (end - start)
-    
-    start = time.time()
-    restart_output = random_restart_hill_climbing(queens_problem_restart, 1000)
-    end = time.time()
-    times[2] += (end - start)
-    
-    start = time.time()
-    annealing_output = simulated_annealing(queens_problem_annealing)
-    end = time.time()
-    times[3] += (end - start)
-    
-    # Count the amount of successes and fails for each algorithm
-    if queens_problem_steepest.goal_test(steepest_output):
-        successes[0] += 1
-    else:
-        fails[0] += 1
-    if queens_problem_first.goal_test(first_output):
-        successes[1] += 1
-    else:
-        fails[1] += 1
-    if queens_problem_restart.goal_test(restart_output):
-        successes[2] += 1
-    else:
-        fails[2] += 1
-    if queens_problem_annealing.goal_test(annealing_output):
-        successes[3] += 1
-    else:
-        fails[3] += 1
-
-# Print Statements
-print("Out of 100 random 8-queens")
-print("Steepest Hill Climbing")
-print("     Successes:", successes[0])
-print("     Fails:", fails[0])
-print("     Time Taken:", times[0])
-print("\nFirst Hill Climbing")
-print("     Successes:", successes[1])
-print("     Fails:", fails[1])
-print("     Time Taken:", times[1])
-print("\nRandom Restart Hill Climbing")
-print("     Successes:", successes[2])
-print("     Fails:", fails[2])
-print("     Time Taken:", times[2])
-print("\nSimulated Annealing")
-print("     Successes:", successes[3])
-print("     Fails:", fails[3])
-print("     Time Taken:", times[3])
\ No newline at end of file
+# Builds the problem for one benchmark trial. Every trial starts from an empty board,
+# so only the algorithms' own random choices differ between trials.
+def benchmark_problem(rng):
+    return NQueensProblem()
+
+ALGORITHMS = [
+    ('Steepest Hill Climbing', steepest_hill_climbing),
+    ('First Hill Climbing', first_choice_hill_climbing),
+    ('Random Restart Hill Climbing', partial(random_restart_hill_climbing, restarts=1000)),
+    ('Simulated Annealing', simulated_annealing),
+    ('Tabu Search', tabu_search),
+]
+
+# Run the benchmark suite for this problem (see benchmark.py for the options). Importing this
+# module only defines the problem and the algorithms.
+if __name__ == '__main__':
+    import benchmark
+    benchmark.main(problem='queens')
@@ -0,0 +1,170 @@
+import functools
+import time
+from collections import Counter
+
+# Opt-in instrumentation for the local search algorithms. Every solver takes a stats argument;
+# when it's None (the default) the solvers run exactly as before, apart from a few `is None`
+# checks. Given a SearchStats object, a solver runs on an InstrumentedProblem that counts and
+# times every call to the problem, and reports restarts and annealing moves to the stats.
+
+# Problem methods that are counted, and the phase their time is added to
+PHASES = {
+    'actions': 'expansion',
+    'random_action': 'expansion',
+    'random_actions': 'expansion',
+    'result': 'expansion',
+    'move': 'expansion',
+    'h': 'evaluation',
+    'value': 'evaluation',
+    'delta': 'evaluation',
+    'best_move': 'evaluation',
+    'move_deltas': 'evaluation',
+    'goal_test': 'goal_test',
+}
+
+class SearchStats:
+    """ Counters and timers filled in by a solver.
+    counters: number of calls of every problem method in PHASES, plus 'restarts', 'accepted'
+        and 'rejected' (annealing moves), 'steps' (solver iterations) and 'saved_restarts'
+        (climbs cut short by a visited filter)
+    timings: nanoseconds spent in every phase ('expansion', 'evaluation', 'goal_test') and in
+        the whole solver ('total'). Only collected when timers is True
+    acceptance_trace: (iteration, fraction of accepted moves) of annealing, one entry per window
+        proposals (per step for the batched version)
+    hook: called as hook(event, stats) on the events 'start', 'restart', 'trace' and 'finish' """
+
+    def __init__(self, hook=None, timers=True, window=100):
+        self.counters = Counter()
+        self.timings = Counter()
+        self.acceptance_trace = []
+        self.hook = hook
+        self.timers = timers
+        self.window = window
+        self.window_accepted = 0
+        self.window_proposals = 0
+        self.started = None
+
+    @property
+    def expanded(self):
+        """ Number of times the moves of a state were listed or sampled """
+        return self.counters['actions'] + self.counters['random_action'] + self.counters['random_actions']
+
+    @property
+    def generated(self):
+        """ Number of successor states built """
+        return self.counters['result'] + self.counters['move']
+
+    @property
+    def evaluations(self):
+        """ Number of calls to h, value and delta """
+        return self.counters['h'] + self.counters['value'] + self.counters['delta']
+
+    def notify(self, event):
+        if self.hook is not None:
+            self.hook(event, self)
+
+    def start(self):
+        self.started = time.perf_counter_ns()
+        self.notify('start')
+
+    def finish(self, state):
+        """ Record the end of a solver run and return its final state """
+        if self.started is not None:
+            self.timings['total'] += time.perf_counter_ns() - self.started
+        self.notify('finish')
+        return state
+
+    def restart(self):
+        self.counters['restarts'] += 1
+        self.notify('restart')
+
+    def proposal(self, t, accepted):
+        """ Record whether the annealing move proposed at iteration t was accepted """
+        self.counters['accepted' if accepted else 'rejected'] += 1
+        self.window_proposals += 1
+        self.window_accepted += accepted
+        if self.window_proposals == self.window:
+            self.acceptance_trace.append((t, self.window_accepted / self.window))
+            self.window_accepted = self.window_proposals = 0
+            self.notify('trace')
+
+    def batch_proposals(self, t, proposals, accepted):
+        """ Record one step of a batched annealing run, in which accepted of the proposals
+        made by all chains were accepted """
+        self.counters['accepted'] += accepted
+        self.counters['rejected'] += proposals - accepted
+        self.acceptance_trace.append((t, accepted / proposals))
+        self.notify('trace')
+
+    def instrument(self, problem):
+        return InstrumentedProblem(problem, self)
+
+    def as_dict(self):
+        return {'counters': dict(self.counters), 'timings_ns': dict(self.timings),
+                'expanded': self.expanded, 'generated': self.generated, 'evaluations': self.evaluations,
+                'acceptance_trace': self.acceptance_trace}
+
+class InstrumentedProblem:
+    """ Wraps a problem so that calls to the methods in PHASES are counted (and timed) in stats.
+    Everything else, including attribute assignment done by the problem itself, goes straight
+    to the wrapped problem """
+
+    def __init__(self, problem, stats):
+        self.problem = problem
+        for name, phase in PHASES.items():
+            method = getattr(problem, name, None)
+            if method is None:
+                continue
+            if name == 'random_actions':
+                setattr(self, name, self.wrap_generator(method, name, phase, stats))
+            else:
+                setattr(self, name, self.wrap(method, name, phase, stats))
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    @staticmethod
+    def wrap(method, name, phase, stats):
+        counters, timings, clock = stats.counters, stats.timings, time.perf_counter_ns
+        if not stats.timers:
+            def counted(*args):
+                counters[name] += 1
+                return method(*args)
+            return counted
+
+        def timed(*args):
+            start = clock()
+            result = method(*args)
+            timings[phase] += clock() - start
+            counters[name] += 1
+            return result
+        return timed
+
+    @staticmethod
+    def wrap_generator(method, name, phase, stats):
+        counters, timings, clock = stats.counters, stats.timings, time.perf_counter_ns
+
+        def timed(*args):
+            counters[name] += 1
+            items = method(*args)
+            while True:
+                start = clock()
+                item = next(items, None)
+                if stats.timers:
+                    timings[phase] += clock() - start
+                if item is None:
+                    return
+                yield item
+        return timed
+
+def instrumented(solver):
+    """ Decorator for the solvers. Adds a stats keyword argument; when it's given, the solver
+    runs on stats.instrument(problem) and the whole run is timed. The solver itself receives
+    stats (or None) to report restarts, annealing moves and steps """
+    @functools.wraps(solver)
+    def wrapper(problem, *args, stats=None, **kwargs):
+        if stats is None:
+            return solver(problem, *args, stats=None, **kwargs)
+        stats.start()
+        return stats.finish(solver(stats.instrument(problem), *args, stats=stats, **kwargs))
+    return wrapper
@@ -0,0 +1,118 @@
+import functools
+import random
+
+import search
+
+# Lightweight states for the local search algorithms.
+# The algorithms never look at the path that led to a state, so instead of search.Node (parent
+# pointer, action, path cost and depth for every neighbor) they work on LocalState records that
+# only hold the state and its cached score. Only when a caller asks for the path (path=True) do
+# the records remember their parent and action, and the final one is turned into a search.Node.
+
+class LocalState:
+    """ A state and its score (whatever the algorithm ranks states by, cached so that it's
+    computed once per state). Has the state attribute of search.Node, so problem.h accepts it """
+    __slots__ = ('state', 'score')
+
+    def __init__(self, state, score=None):
+        self.state = state
+        self.score = score
+
+    def child(self, state, action, score=None):
+        """ Record of the state reached from this one by action """
+        return LocalState(state, score)
+
+    def node(self, problem):
+        return search.Node(self.state)
+
+class TracedState(LocalState):
+    """ LocalState that also remembers how it was reached, used when the path is asked for """
+    __slots__ = ('parent', 'action')
+
+    def __init__(self, state, score=None, parent=None, action=None):
+        super().__init__(state, score)
+        self.parent = parent
+        self.action = action
+
+    def child(self, state, action, score=None):
+        return TracedState(state, score, self, action)
+
+    def node(self, problem):
+        """ Return the search.Node chain (with path costs) from the initial state to this one """
+        records = []
+        record = self
+        while record is not None:
+            records.append(record)
+            record = record.parent
+        node = search.Node(records[-1].state)
+        for record in reversed(records[:-1]):
+            node = search.Node(record.state, node, record.action,
+                               problem.path_cost(node.path_cost, node.state, record.action, record.state))
+        return node
+
+def expand(problem, record, score):
+    """ Path-free expansion: the records of all the neighbors of record, with score(state) cached """
+    child = record.child
+    return [child(next_state, action, score(next_state))
+            for action in problem.actions(record.state)
+            for next_state in (problem.result(record.state, action),)]
+
+class PicklableRng:
+    """ Mixin for problems whose rng attribute defaults to the random module, which can't be
+    pickled. The module is left out of the pickled state and put back when it's unpickled, so
+    such problems can still be sent to worker processes """
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if state.get('rng') is random:
+            state['rng'] = None
+        return state
+
+    def __setstate__(self, state):
+        if 'rng' in state and state['rng'] is None:
+            state['rng'] = random
+        self.__dict__.update(state)
+
+# Same as search.argmax_random_tie, but breaks ties with the given random number generator
+def argmax_random_tie(seq, key, rng=random):
+    items = list(seq)
+    rng.shuffle(items)
+    return max(items, key=key)
+
+def local_search(algorithm):
+    """ Decorator for the algorithms. The algorithm gets start, the record class to wrap its
+    initial state in, and returns the record of its final state. Adds a path keyword argument:
+    the decorated algorithm returns the final state, or with path=True the search.Node of the
+    final state, whose path() and solution() lead there from the initial state """
+    @functools.wraps(algorithm)
+    def wrapper(problem, *args, path=False, **kwargs):
+        record = algorithm(problem, *args, start=TracedState if path else LocalState, **kwargs)
+        return record.node(problem) if path else record.state
+    return wrapper
+
+class TabuList:
+    """ The last size items added, for tabu search: a ring buffer remembers their order, so the
+    oldest one leaves when a new one comes in, and a dict counts them for O(1) membership tests """
+    __slots__ = ('ring', 'position', 'counts')
+
+    def __init__(self, size):
+        self.ring = [None] * max(1, size)
+        self.position = 0
+        self.counts = {}
+
+    def add(self, item):
+        old = self.ring[self.position]
+        if old is not None:
+            if self.counts[old] == 1:
+                del self.counts[old]
+            else:
+                self.counts[old] -= 1
+        self.ring[self.position] = item
+        self.counts[item] = self.counts.get(item, 0) + 1
+        self.position = (self.position + 1) % len(self.ring)
+
+    def __contains__(self, item):
+        return item in self.counts
+
+    def __iter__(self):
+        return iter(self.counts)
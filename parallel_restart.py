@@ -0,0 +1,82 @@
+import copy
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import search
+
+import eightpuzzle
+import eightqueens
+from budget import Budget, CancellationToken
+
+# Parallel random restart hill climbing. The restarts are split evenly over a process pool; each
+# worker climbs its share with its own copy of the problem and its own seeded random number
+# generator, so the serial algorithm's habit of changing problem.initial between restarts is
+# harmless. The workers share a stop event: the first worker to reach the goal sets the event,
+# and the budgets of all the others see it on their next step.
+# Restarts are independent, so the speed up grows with the number of cores.
+
+# Shared between the worker processes (see init_worker)
+stop_event = None
+
+def init_worker(event):
+    global stop_event
+    stop_event = event
+
+def default_solver(problem):
+    """ The random_restart_hill_climbing of the module the problem belongs to """
+    if isinstance(problem, eightpuzzle.EightPuzzle):
+        return eightpuzzle.random_restart_hill_climbing
+    return eightqueens.random_restart_hill_climbing
+
+def restart_worker(job):
+    """ Run one worker's share of the restarts, chunk restarts at a time. Returns the worker's
+    best state and its h """
+    solver, problem, restarts, chunk, deadline = job
+    token = CancellationToken(stop_event)
+    best_state, best_h = problem.initial, math.inf
+    while restarts > 0 and not token.cancelled:
+        n = min(chunk, restarts)
+        restarts -= n
+        # Every restart ends with a new random initial state, so the next chunk goes on from there
+        state = solver(problem, n, budget=Budget(token=token, deadline=deadline))
+        h = problem.h(search.Node(state))
+        if h < best_h:
+            best_state, best_h = state, h
+        if problem.goal_test(state):
+            stop_event.set()
+    return best_state, best_h
+
+def parallel_random_restart(problem, restarts=1000, workers=None, seed=None, chunk=50, timeout=None, solver=None):
+    """ Same as random_restart_hill_climbing(problem, restarts), but the restarts are spread over
+    workers processes (default: one per core). Returns the best state found by any worker; the
+    search stops as soon as one of them reaches the goal, or after timeout seconds.
+    The workers' random number generators are seeded from seed, which defaults to a number
+    drawn from problem.rng; pass one to repeat a run (exactly with one worker; with several,
+    which worker finishes first may vary). solver defaults to the
+    random_restart_hill_climbing of the problem's module. problem itself is left unchanged """
+    solver = solver or default_solver(problem)
+    workers = max(1, min(workers or os.cpu_count() or 1, restarts))
+    # time.monotonic is the same clock in every process, so one deadline serves all workers
+    deadline = None if timeout is None else time.monotonic() + timeout
+    # Restarts after the first climb don't depend on the instance, so a fixed default seed
+    # would replay the same restarts on every call
+    if seed is None:
+        seed = problem.rng.getrandbits(64)
+    jobs = []
+    for i in range(workers):
+        worker_problem = copy.copy(problem)
+        worker_problem.rng = random.Random('{}:{}'.format(seed, i))
+        jobs.append((solver, worker_problem, restarts // workers + (i < restarts % workers), chunk, deadline))
+
+    event = multiprocessing.Event()
+    if workers == 1:
+        init_worker(event)
+        results = [restart_worker(jobs[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(event,)) as executor:
+            results = list(executor.map(restart_worker, jobs))
+    return min(results, key=lambda result: result[1])[0]
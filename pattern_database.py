@@ -0,0 +1,195 @@
+import mmap
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Additive disjoint pattern databases for sliding tile puzzles of any size.
+# The tiles are split into disjoint patterns. For every placement of a pattern's tiles, its table
+# holds the fewest moves of those tiles needed to bring them to their goal squares, where a tile
+# may slide onto any neighboring square not taken by another tile of the pattern. Every real move
+# moves exactly one tile, so the values of the patterns can be added and the sum still never
+# overestimates: h(state) = sum of one table lookup per pattern, and it is never below the
+# Manhattan distance.
+#
+# A placement is indexed as the sum of position(tile j) * n**j (n squares on the board), so a table
+# has n**k one-byte entries for a pattern of k tiles, and moving one tile changes the index of its
+# pattern by (new position - old position) * n**j, which lets ida_star update h in O(1) per move.
+# The tables are built offline by a breadth-first search back from the goal, vectorized with NumPy,
+# saved to a single file and memory-mapped when first used.
+#
+#   python pattern_database.py 4       builds the default database of the 15-puzzle
+
+MAGIC = b'SPDB'
+UNREACHED = 255
+
+# Default partitions of the tiles (for the goal with the blank in the top left corner) into
+# groups of neighboring tiles: 4-4 for the 8-puzzle, 5-5-5 for the 15-puzzle, 4x6 for the 24-puzzle
+DEFAULT_PATTERNS = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 3, 6, 7), (4, 5, 8, 9, 12), (10, 11, 13, 14, 15)),
+    5: ((1, 2, 6, 7), (3, 4, 8, 9), (5, 10, 15, 20), (11, 12, 16, 17), (13, 14, 18, 19), (21, 22, 23, 24)),
+}
+
+def default_path(size):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pattern_database_{0}x{0}.bin'.format(size))
+
+def neighbor_table(size):
+    """ n x 4 array of the squares next to every square, padded with -1 """
+    n = size * size
+    neighbors = np.full((n, 4), -1, dtype=np.int64)
+    for i in range(n):
+        row, col = divmod(i, size)
+        for d, (dr, dc) in enumerate(((-1, 0), (1, 0), (0, -1), (0, 1))):
+            if 0 <= row + dr < size and 0 <= col + dc < size:
+                neighbors[i, d] = i + dr * size + dc
+    return neighbors
+
+def build_pattern(size, tiles, goal):
+    """ Return the bytearray of distances of one pattern (a tuple of tiles) """
+    n = size * size
+    k = len(tiles)
+    weights = n ** np.arange(k, dtype=np.int64)
+    neighbors = neighbor_table(size)
+    distances = np.full(n ** k, UNREACHED, dtype=np.uint8)
+    start = sum(goal.index(tile) * n ** j for j, tile in enumerate(tiles))
+    distances[start] = 0
+    frontier = np.array([start], dtype=np.int64)
+    depth = 0
+
+    while frontier.size:
+        depth += 1
+        positions = (frontier[:, None] // weights) % n
+        successors = []
+        for j in range(k):
+            for d in range(4):
+                target = neighbors[positions[:, j], d]
+                free = (target >= 0) & ~(positions == target[:, None]).any(axis=1)
+                successors.append(frontier[free] + (target[free] - positions[free, j]) * weights[j])
+        frontier = np.unique(np.concatenate(successors))
+        frontier = frontier[distances[frontier] == UNREACHED]
+        distances[frontier] = depth
+
+    return bytearray(distances.tobytes())
+
+def save(path, size, goal, patterns):
+    """ Build the table of every pattern and write them to path. The tables are written to a
+    temporary file next to path that then replaces it, so other processes never see a file that
+    is only partly written """
+    header = MAGIC + bytes([size, len(patterns)]) + bytes(goal)
+    for tiles in patterns:
+        header += bytes([len(tiles)]) + bytes(tiles)
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        # mkstemp makes the file readable by its owner only
+        os.chmod(temporary, 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            for tiles in patterns:
+                f.write(build_pattern(size, tiles, goal))
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+class PatternDatabase:
+    """ Additive disjoint pattern database of a size x size puzzle. Nothing is read until the
+    first lookup, when the file at path (default: default_path(size)) is memory-mapped, after
+    building it if it doesn't exist. patterns (default: DEFAULT_PATTERNS[size], or those of an
+    existing file) must split all the tiles into disjoint groups """
+
+    def __init__(self, path=None, size=4, goal=None, patterns=None):
+        self.size = size
+        self.path = path or default_path(size)
+        self.goal = tuple(goal) if goal is not None else tuple(range(size * size))
+        self.requested_patterns = patterns
+        self.data = None
+
+    def load(self):
+        """ Map the file into memory (building it first if needed) and set up the lookup tables """
+        if self.data is not None:
+            return
+        if not os.path.exists(self.path):
+            patterns = self.requested_patterns or DEFAULT_PATTERNS[self.size]
+            check_patterns(patterns, self.size)
+            save(self.path, self.size, self.goal, patterns)
+        with open(self.path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        n = self.size * self.size
+        if len(data) < len(MAGIC) + 2 + n or data[:len(MAGIC)] != MAGIC or data[len(MAGIC)] != self.size:
+            data.close()
+            raise ValueError('{} is not a pattern database of a {}x{} puzzle'.format(self.path, self.size, self.size))
+        offset = len(MAGIC) + 2
+        goal = tuple(data[offset:offset + n])
+        if goal != self.goal:
+            data.close()
+            raise ValueError('{} was built for the goal {}'.format(self.path, goal))
+        offset += n
+        patterns = []
+        for _ in range(data[len(MAGIC) + 1]):
+            if offset >= len(data):
+                data.close()
+                raise ValueError('{} is not a complete pattern database'.format(self.path))
+            k = data[offset]
+            patterns.append(tuple(data[offset + 1:offset + 1 + k]))
+            offset += 1 + k
+        if self.requested_patterns is not None and [tuple(p) for p in self.requested_patterns] != patterns:
+            data.close()
+            raise ValueError('{} was built for the patterns {}'.format(self.path, patterns))
+        # A file cut short (e.g. by an interrupted build) would fail deep in a search instead
+        if len(data) != offset + sum(n ** len(tiles) for tiles in patterns):
+            data.close()
+            raise ValueError('{} is not a complete pattern database'.format(self.path))
+
+        view = memoryview(data)
+        self.tables = []
+        for tiles in patterns:
+            self.tables.append(view[offset:offset + n ** len(tiles)])
+            offset += n ** len(tiles)
+        self.patterns = patterns
+        # Pattern number and index weight of every tile (the blank belongs to no pattern)
+        self.tile_pattern = [None] * n
+        self.tile_weight = [0] * n
+        for p, tiles in enumerate(patterns):
+            for j, tile in enumerate(tiles):
+                self.tile_pattern[tile] = p
+                self.tile_weight[tile] = n ** j
+        self.data = data
+
+    def close(self):
+        if self.data is not None:
+            for table in self.tables:
+                table.release()
+            self.data.close()
+            self.data = None
+
+    def indexes(self, state):
+        """ Return the table index of every pattern in state """
+        self.load()
+        indexes = [0] * len(self.patterns)
+        tile_pattern, tile_weight = self.tile_pattern, self.tile_weight
+        for position, tile in enumerate(state):
+            if tile:
+                indexes[tile_pattern[tile]] += position * tile_weight[tile]
+        return indexes
+
+    def h(self, state):
+        """ Lower bound on the number of moves from state to the goal """
+        indexes = self.indexes(state)
+        return sum(table[i] for table, i in zip(self.tables, indexes))
+
+def check_patterns(patterns, size):
+    tiles = sorted(tile for pattern in patterns for tile in pattern)
+    if tiles != list(range(1, size * size)):
+        raise ValueError('the patterns must split the tiles 1 to {} into disjoint groups'.format(size * size - 1))
+
+# Build the default database of the size given as argument (default 4), optionally saved to
+# the path given as second argument
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    path = sys.argv[2] if len(sys.argv) > 2 else default_path(size)
+    check_patterns(DEFAULT_PATTERNS[size], size)
+    save(path, size, tuple(range(size * size)), DEFAULT_PATTERNS[size])
+    print('Saved the pattern database of the {}x{} puzzle to'.format(size, size), path)
@@ -0,0 +1,151 @@
+import json
+import multiprocessing.util
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+
+import eightpuzzle
+import eightqueens
+from instrumentation import SearchStats
+from solution_cache import SolutionCache
+
+# Streaming batch solver. Instances are read lazily one JSON line at a time, solved in a process
+# pool that never holds more than a fixed number of instances, and their results are yielded as
+# soon as they finish, so files with millions of instances are solved in constant memory.
+#
+# Input lines for the eight puzzle are a state ([1, 2, 0, ...]) or {"state": [...], "goal": [...]}.
+# Input lines for the queens are a board size (8), a board ([3, 0, ...]), {"n": 8} or {"state": [...]}.
+# Every result is {"id": line number, "state": final state, "success": ..., "steps": states
+# generated, "time": seconds}, or {"id": line number, "error": message} for lines that can't be read.
+# With stats=True results also get the solver's full SearchStats under "stats".
+# With a cache (the path of a solution_cache.SolutionCache) instances solved before are answered
+# from it without searching and new solutions are added to it; results then also get "cached".
+# Running a batch with a cache is how to pre-warm it.
+
+ALGORITHMS = {
+    'eightpuzzle': {
+        'steepest': eightpuzzle.steepest_hill_climbing,
+        'first-choice': eightpuzzle.first_choice_hill_climbing,
+        'random-restart': eightpuzzle.random_restart_hill_climbing,
+        'annealing': eightpuzzle.simulated_annealing,
+        'tabu': eightpuzzle.tabu_search,
+    },
+    'queens': {
+        'steepest': eightqueens.steepest_hill_climbing,
+        'first-choice': eightqueens.first_choice_hill_climbing,
+        'random-restart': partial(eightqueens.random_restart_hill_climbing, restarts=1000),
+        'annealing': eightqueens.simulated_annealing,
+        'min-conflicts': eightqueens.min_conflicts,
+        'tabu': eightqueens.tabu_search,
+    },
+}
+
+def make_problem(problem, instance, rng):
+    """ Build the problem described by one parsed input line, raising ValueError if the
+    line doesn't describe a valid instance """
+    if problem == 'eightpuzzle':
+        goal = tuple(range(9))
+        if isinstance(instance, dict):
+            goal = tuple(instance.get('goal', goal))
+            instance = instance['state']
+        state = tuple(instance)
+        if sorted(state) != list(range(9)) or sorted(goal) != list(range(9)):
+            raise ValueError('eight puzzle states must be permutations of 0 to 8')
+        # Packed states carry h and value, which are updated in O(1) per move
+        return eightpuzzle.PackedEightPuzzle(state, goal, rng)
+
+    if isinstance(instance, dict):
+        instance = instance['n'] if 'n' in instance else instance['state']
+    if isinstance(instance, int):
+        if instance < 1:
+            raise ValueError('the board size must be positive')
+        return eightqueens.NQueensProblem(instance, rng)
+    state = tuple(instance)
+    if not state or not all(isinstance(r, int) and 0 <= r < len(state) for r in state):
+        raise ValueError('a board must give every column a row between 0 and N - 1')
+    queens = eightqueens.NQueensProblem(len(state), rng)
+    queens.initial = state
+    return queens
+
+# Open caches of this process, by path
+caches = {}
+
+def open_cache(path):
+    """ The SolutionCache at path, opened once per process and closed when the process exits """
+    if path not in caches:
+        caches[path] = SolutionCache(path)
+        multiprocessing.util.Finalize(caches[path], caches[path].close, exitpriority=0)
+    return caches[path]
+
+def solve_instance(job):
+    """ Solve one input line and return its result record """
+    problem_name, algorithm_name, seed, number, line, with_stats, cache_path = job
+    try:
+        problem = make_problem(problem_name, json.loads(line), random.Random('{}:{}'.format(seed, number)))
+    except (ValueError, TypeError, KeyError) as e:
+        return {'id': number, 'error': '{}: {}'.format(type(e).__name__, e)}
+    # Per-phase timers are only worth their cost when the stats are reported
+    stats = SearchStats(timers=with_stats)
+
+    solver = ALGORITHMS[problem_name][algorithm_name]
+    cache = open_cache(cache_path) if cache_path else None
+
+    start = time.perf_counter()
+    if cache is None:
+        state = solver(problem, stats=stats)
+    else:
+        hits = cache.hits
+        state = cache.solve(solver, problem, stats=stats)
+    elapsed = time.perf_counter() - start
+
+    success = problem.goal_test(state)
+    if isinstance(problem, eightpuzzle.PackedEightPuzzle):
+        state = eightpuzzle.unpack(state)
+    record = {'id': number, 'state': list(state), 'success': success,
+              'steps': stats.generated, 'time': elapsed}
+    if cache is not None:
+        record['cached'] = cache.hits > hits
+    if with_stats:
+        record['stats'] = stats.as_dict()
+    return record
+
+def solve_stream(lines, problem, algorithm, workers=None, max_in_flight=None, seed=0, stats=False, cache=None):
+    """ Yield the result record of every non-blank line of lines (any iterable of JSON strings,
+    e.g. an open file or sys.stdin) in the order they finish. At most max_in_flight instances
+    (default four per worker) are read ahead of the results. With workers=1 the instances are
+    solved one by one in this process, in input order. cache is the path of a solution cache to use """
+    if algorithm not in ALGORITHMS[problem]:
+        raise ValueError('unknown algorithm {!r} for {}'.format(algorithm, problem))
+    jobs = ((problem, algorithm, seed, number, line, stats, cache)
+            for number, line in enumerate(lines, 1) if line.strip())
+
+    if workers == 1:
+        for job in jobs:
+            yield solve_instance(job)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 4 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for job in jobs:
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(executor.submit(solve_instance, job))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+def write_results(records, output):
+    """ Write every record as a JSON line as soon as it arrives, returning how many were written """
+    count = 0
+    for record in records:
+        output.write(json.dumps(record) + '\n')
+        output.flush()
+        count += 1
+    return count
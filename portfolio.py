@@ -0,0 +1,89 @@
+import copy
+import multiprocessing
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import search
+
+import eightpuzzle
+import eightqueens
+from budget import Budget, CancellationToken
+
+# Algorithm portfolio. Every algorithm of a problem's module (plus differently seeded copies of
+# them) runs on the same instance in its own worker process. The first one to reach the goal wins:
+# the others are told to stop through a shared event that their budgets check on every iteration,
+# and the ones that haven't started yet are cancelled. On a multi-core machine a solve then takes
+# about as long as the fastest strategy for the instance.
+#
+#   result = solve_portfolio(EightPuzzle((1, 2, 5, 3, 4, 0, 6, 7, 8)))
+#   result['winner'], result['state']
+
+# Event shared by the worker processes, set when the race is over
+stop_event = None
+
+def init_worker(event):
+    global stop_event
+    stop_event = event
+
+def default_algorithms(problem):
+    """ The (name, algorithm) pairs of the module the problem belongs to """
+    if isinstance(problem, eightpuzzle.EightPuzzle):
+        return eightpuzzle.ALGORITHMS
+    return eightqueens.ALGORITHMS
+
+def run_entry(job):
+    """ Run one entry of the portfolio and return (name, final state, success, time taken) """
+    name, algorithm, problem, timeout = job
+    budget = Budget(timeout, token=CancellationToken(stop_event))
+    start = time.perf_counter()
+    state = algorithm(problem, budget=budget)
+    return name, state, problem.goal_test(state), time.perf_counter() - start
+
+def solve_portfolio(problem, algorithms=None, copies=2, workers=None, seed=0, timeout=None):
+    """ Race copies runs of every (name, algorithm) pair in algorithms (default: the ALGORITHMS
+    of the problem's module) on problem, each with its own random number generator, and return
+    {'winner': name of the first run that reached the goal, 'state': its final state,
+     'success': ..., 'time': seconds until the winner finished, 'finished': names of the runs
+     that finished first, in order}.
+    Runs after the first copy are named 'name #2', 'name #3', ... If no run reaches the goal
+    (within timeout seconds, if given) the winner is the run whose final state has the lowest h.
+    workers defaults to one process per run """
+    algorithms = algorithms or default_algorithms(problem)
+    jobs = []
+    for i in range(copies):
+        for name, algorithm in algorithms:
+            entry_name = name if i == 0 else '{} #{}'.format(name, i + 1)
+            # Every entry gets a copy of the problem, since some algorithms change its initial state
+            entry_problem = copy.copy(problem)
+            entry_problem.rng = random.Random('{}:{}'.format(seed, entry_name))
+            jobs.append((entry_name, algorithm, entry_problem, timeout))
+
+    event = multiprocessing.Event()
+    # By default every run gets its own process even if there are fewer cores, since runs
+    # waiting for a free worker couldn't win the race
+    workers = workers or len(jobs)
+    finished = []
+    best = None
+    start = time.perf_counter()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(event,))
+    try:
+        pending = {executor.submit(run_entry, job) for job in jobs}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, state, success, _ = future.result()
+                finished.append(name)
+                if success:
+                    return {'winner': name, 'state': state, 'success': True,
+                            'time': time.perf_counter() - start, 'finished': finished}
+                h = problem.h(search.Node(state))
+                if best is None or h < best[0]:
+                    best = (h, name, state)
+    finally:
+        event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    _, name, state = best
+    return {'winner': name, 'state': state, 'success': False, 'time': time.perf_counter() - start,
+            'finished': finished}
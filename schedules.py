@@ -0,0 +1,126 @@
+import copy
+import math
+
+# Annealing schedules for simulated_annealing.
+# A schedule is either a plain function of the iteration t returning the temperature (0 ends the
+# run), like exp_schedule, or a Schedule object. simulated_annealing gets a fresh copy of a Schedule
+# object for every run from start(), reads the temperature of every iteration from schedule(t), and
+# reports every proposal back with schedule.observe(accepted, h), where h is the heuristic value of
+# the current state after the proposal. That feedback lets a schedule adapt its temperature to the
+# observed acceptance rate, reheat when the search stagnates and end runs that stopped improving.
+# Temperatures are plain floats computed with math.exp.
+
+class Schedule:
+    """ Base class of the schedule objects. Keeps track of the best h seen so far and of the
+    number of proposals since it last improved.
+    limit: maximum number of iterations
+    patience: number of proposals without a new best h after which the run is stagnant
+        (None: never) """
+
+    def __init__(self, limit=5000, patience=None):
+        self.limit = limit
+        self.patience = patience
+        self.reset()
+
+    def start(self):
+        """ Return a copy of the schedule ready for a new run, so that one schedule object can
+        be shared by many runs (and threads) """
+        run = copy.copy(self)
+        run.reset()
+        return run
+
+    def reset(self):
+        self.best_h = math.inf
+        self.since_improvement = 0
+
+    def observe(self, accepted, h):
+        if h < self.best_h:
+            self.best_h = h
+            self.since_improvement = 0
+        else:
+            self.since_improvement += 1
+
+    @property
+    def stagnant(self):
+        return self.patience is not None and self.since_improvement >= self.patience
+
+    def temperature(self, t):
+        raise NotImplementedError
+
+    def __call__(self, t):
+        if t >= self.limit or self.stagnant:
+            return 0
+        return self.temperature(t)
+
+class ExponentialSchedule(Schedule):
+    """ k * exp(-lam * t), like exp_schedule, but stops early once the run is stagnant """
+
+    def __init__(self, k=20, lam=0.001, limit=5000, patience=None):
+        super().__init__(limit, patience)
+        self.k = k
+        self.lam = lam
+
+    def temperature(self, t):
+        return self.k * math.exp(-self.lam * t)
+
+class AdaptiveSchedule(Schedule):
+    """ Temperature steered by the acceptance rate. The target acceptance rate falls
+    exponentially from start_rate to end_rate over cooling_time proposals; after every window
+    proposals the temperature is multiplied by exp(gain * (target - observed rate)), so it
+    follows the target whatever the scale of h is. When the run is stagnant the temperature is
+    reset to reheat * T0 and the target starts falling again, up to reheats times; after that
+    a stagnant run stops.
+    T0: initial temperature
+    window: proposals per adjustment """
+
+    def __init__(self, T0=2.0, start_rate=0.5, end_rate=0.05, cooling_time=2000, window=20, gain=2.0,
+                 reheat=0.5, reheats=30, patience=200, limit=50000):
+        self.T0 = T0
+        self.start_rate = start_rate
+        self.end_rate = end_rate
+        self.cooling_time = cooling_time
+        self.window = window
+        self.gain = gain
+        self.reheat = reheat
+        self.reheats = reheats
+        super().__init__(limit, patience)
+
+    def reset(self):
+        super().reset()
+        self.T = self.T0
+        self.reheated = 0
+        self.phase_start = 0
+        self.proposals = 0
+        self.window_proposals = 0
+        self.window_accepted = 0
+
+    def target(self):
+        """ Acceptance rate aimed at after the current number of proposals """
+        progress = (self.proposals - self.phase_start) / self.cooling_time
+        return self.end_rate + (self.start_rate - self.end_rate) * math.exp(-3 * progress)
+
+    def observe(self, accepted, h):
+        super().observe(accepted, h)
+        self.proposals += 1
+        self.window_proposals += 1
+        self.window_accepted += accepted
+        if self.window_proposals == self.window:
+            rate = self.window_accepted / self.window
+            self.T *= math.exp(self.gain * (self.target() - rate))
+            self.window_proposals = self.window_accepted = 0
+
+    def __call__(self, t):
+        if self.stagnant and self.reheated < self.reheats:
+            self.reheated += 1
+            self.T = self.reheat * self.T0
+            self.phase_start = self.proposals
+            self.since_improvement = 0
+        return super().__call__(t)
+
+    def temperature(self, t):
+        return self.T
+
+def start(schedule):
+    """ Return the schedule to use for one run: a fresh copy of a Schedule object, or a plain
+    schedule function as it is """
+    return schedule.start() if isinstance(schedule, Schedule) else schedule
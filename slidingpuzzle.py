@@ -0,0 +1,222 @@
+import search
+import math
+import random
+from functools import lru_cache
+
+from eightpuzzle import swap_tiles, tile_order, tiles_parity
+from localsearch import PicklableRng
+from pattern_database import PatternDatabase
+
+# Sliding tile puzzle of any size: the 8-puzzle (3x3), 15-puzzle (4x4), 24-puzzle (5x5), ...
+# SlidingPuzzle has the same interface as EightPuzzle, so the algorithms in eightpuzzle.py run on it
+# unchanged. Its heuristic is the Manhattan distance, or an additive pattern database (see
+# pattern_database.py) when one is given. ida_star finds optimal solutions with a pattern database.
+
+# Legal moves of the blank on a size x size board, as {action: new blank position} for every
+# position of the blank. Same actions as the eight puzzle: the direction the blank moves in.
+@lru_cache(maxsize=None)
+def board_moves(size):
+    moves = []
+    for blank in range(size * size):
+        legal = {}
+        if blank >= size:
+            legal['UP'] = blank - size
+        if blank < size * (size - 1):
+            legal['DOWN'] = blank + size
+        if blank % size != 0:
+            legal['LEFT'] = blank - 1
+        if blank % size != size - 1:
+            legal['RIGHT'] = blank + 1
+        moves.append(legal)
+    return moves
+
+class SlidingPuzzle(PicklableRng, search.Problem):
+    """ The problem of sliding tiles numbered from 1 to size * size - 1 on a size x size board.
+    A state is a tuple of length size * size holding the tile at every square (0 for the blank).
+    The size is taken from the initial state unless given. With a pattern_database (a
+    PatternDatabase for the same size and goal) h uses it instead of the Manhattan distance """
+
+    def __init__(self, initial, goal=None, size=None, rng=random, pattern_database=None):
+        size = size or math.isqrt(len(initial))
+        if goal is None:
+            goal = tuple(range(size * size))
+        super().__init__(tuple(initial), tuple(goal))
+        self.size = size
+        self.rng = rng
+        self.pattern_database = pattern_database
+        self.moves = board_moves(size)
+        self.move_actions = [tuple(legal) for legal in self.moves]
+        self.tile_order = tile_order(self.goal)
+        # Manhattan distance and goal square match of every tile on every square,
+        # indexed by tile * n + square
+        n = size * size
+        self.distances = [0] * (n * n)
+        self.matches = [0] * (n * n)
+        for goal_index, tile in enumerate(self.goal):
+            for i in range(n):
+                if tile != 0:
+                    self.distances[tile * n + i] = (abs(i // size - goal_index // size)
+                                                    + abs(i % size - goal_index % size))
+                self.matches[tile * n + i] = int(i == goal_index)
+
+    def find_blank_square(self, state):
+        return state.index(0)
+
+    def tile_at(self, state, square):
+        return state[square]
+
+    def actions(self, state):
+        return self.move_actions[self.find_blank_square(state)]
+
+    def random_action(self, state):
+        return self.rng.choice(self.actions(state))
+
+    def random_actions(self, state):
+        actions = list(self.actions(state))
+        self.rng.shuffle(actions)
+        yield from actions
+
+    def result(self, state, action):
+        blank = self.find_blank_square(state)
+        neighbor = self.moves[blank][action]
+        new_state = list(state)
+        new_state[blank], new_state[neighbor] = new_state[neighbor], new_state[blank]
+        return tuple(new_state)
+
+    def goal_test(self, state):
+        return state == self.goal
+
+    def check_solvability(self, state):
+        """ Checks if the goal can be reached from the given state. On boards of odd width the
+        tiles must be an even permutation of the goal's; on boards of even width every vertical
+        move also flips the permutation's parity, so it must match the parity of the number of
+        rows between the blank's square and its goal square """
+        parity = tiles_parity(state, self.tile_order)
+        if self.size % 2:
+            return parity == 0
+        rows = abs(state.index(0) // self.size - self.goal.index(0) // self.size)
+        return (parity + rows) % 2 == 0
+
+    def h(self, node):
+        if self.pattern_database is not None:
+            return self.pattern_database.h(node.state)
+        n, distances = len(node.state), self.distances
+        return sum(distances[tile * n + i] for i, tile in enumerate(node.state))
+
+    # With solvable=True the state is drawn uniformly from the states that can reach the goal.
+    def set_random_initial(self, solvable=False):
+        numbers = list(range(self.size * self.size))
+        self.rng.shuffle(numbers)
+        # Swapping two tiles flips the parity without moving the blank
+        if solvable and not self.check_solvability(numbers):
+            swap_tiles(numbers)
+        self.initial = tuple(numbers)
+
+    def value(self, state):
+        n, matches = len(state), self.matches
+        return sum(matches[tile * n + i] for i, tile in enumerate(state))
+
+# Generates a random puzzle of the given size. With solvable=True the puzzle is drawn uniformly
+# from the puzzles that can reach the default goal.
+def random_puzzle(size=4, rng=random, solvable=False):
+    problem = SlidingPuzzle(tuple(range(size * size)), rng=rng)
+    problem.set_random_initial(solvable)
+    return problem.initial
+
+# Iterative deepening A* with an additive pattern database.
+# The board is a list changed in place, and the pattern indexes and h are updated in O(1) per move
+# (only the moved tile's pattern changes), so a node costs a few list operations. Moves that undo
+# the previous move are skipped.
+# h is the larger of two database lookups: one on the board and one on its reflection in the main
+# diagonal. Reflecting the board also reflects the goal, so the tiles of the reflected board are
+# renamed after the goal squares they are reflected to; it then has the same goal and the same
+# distance to it, but its tiles fall into the patterns differently. This only works when the
+# goal's blank is on the diagonal (as in the default goal); otherwise the plain lookup is used.
+def ida_star(problem, pattern_database=None, budget=None):
+    """ Return an optimal list of actions that take problem.initial to the goal, or None if there
+    is none or the budget (a budget.Budget, one iteration per node) ran out first.
+    pattern_database defaults to problem.pattern_database, or else the default database of the
+    problem's size and goal (built and saved first if it doesn't exist) """
+    if not problem.check_solvability(problem.initial):
+        return None
+    database = pattern_database or problem.pattern_database or PatternDatabase(size=problem.size, goal=problem.goal)
+    size, n = problem.size, len(problem.goal)
+    mirror = [(i % size) * size + i // size for i in range(n)]
+    goal_square = {tile: i for i, tile in enumerate(problem.goal)}
+    reflect = mirror[goal_square[0]] == goal_square[0]
+    # Name of every tile on the reflected board
+    rename = [problem.goal[mirror[goal_square[tile]]] for tile in range(n)]
+    reflected = [0] * n
+    for i, tile in enumerate(problem.initial):
+        reflected[mirror[i]] = rename[tile]
+
+    indexes = database.indexes(problem.initial)
+    reflected_indexes = database.indexes(reflected)
+    tables, tile_pattern, tile_weight = database.tables, database.tile_pattern, database.tile_weight
+    neighbors = [list(legal.items()) for legal in problem.moves]
+    board = list(problem.initial)
+    path = []
+    found = -1
+
+    def search_bound(blank, g, h, reflected_h, previous, bound):
+        """ Depth-first search below the current node, whose f is at most bound; returns found
+        or the smallest f above bound. Children over the bound are priced here without a call """
+        if h == 0:
+            return found
+        if budget is not None and budget.step():
+            return math.inf
+        g += 1
+        minimum = math.inf
+        for action, neighbor in neighbors[blank]:
+            if neighbor == previous:
+                continue
+            tile = board[neighbor]
+            p = tile_pattern[tile]
+            table = tables[p]
+            old = indexes[p]
+            new = old + (blank - neighbor) * tile_weight[tile]
+            child_h = h - table[old] + table[new]
+            if g + child_h > bound:
+                if g + child_h < minimum:
+                    minimum = g + child_h
+                continue
+            child_reflected_h = 0
+            if reflect:
+                # The renamed tile moves between the reflected squares
+                reflected_tile = rename[tile]
+                q = tile_pattern[reflected_tile]
+                reflected_table = tables[q]
+                reflected_old = reflected_indexes[q]
+                reflected_new = reflected_old + (mirror[blank] - mirror[neighbor]) * tile_weight[reflected_tile]
+                child_reflected_h = reflected_h - reflected_table[reflected_old] + reflected_table[reflected_new]
+                if g + child_reflected_h > bound:
+                    if g + child_reflected_h < minimum:
+                        minimum = g + child_reflected_h
+                    continue
+                reflected_indexes[q] = reflected_new
+            board[blank], board[neighbor] = tile, 0
+            indexes[p] = new
+            path.append(action)
+            t = search_bound(neighbor, g, child_h, child_reflected_h, blank, bound)
+            if t == found:
+                return found
+            path.pop()
+            board[blank], board[neighbor] = 0, tile
+            indexes[p] = old
+            if reflect:
+                reflected_indexes[q] = reflected_old
+            if t < minimum:
+                minimum = t
+        return minimum
+
+    h = sum(table[i] for table, i in zip(tables, indexes))
+    reflected_h = sum(table[i] for table, i in zip(tables, reflected_indexes)) if reflect else 0
+    bound = max(h, reflected_h)
+    blank = board.index(0)
+    while True:
+        t = search_bound(blank, 0, h, reflected_h, None, bound)
+        if t == found:
+            return path
+        if t == math.inf:
+            return None
+        bound = t
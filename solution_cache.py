@@ -0,0 +1,211 @@
+import json
+import math
+import os
+import sqlite3
+import time
+from functools import lru_cache
+
+import eightpuzzle
+import eightqueens
+import slidingpuzzle
+
+# Persistent cache of solved instances, shared by every process that opens the same file.
+# Only goal states are stored: a goal is a correct answer from any initial state, whichever
+# algorithm found it, so a hit skips the search entirely. Failures are never stored, since
+# another run (or another algorithm) may still solve the instance.
+#
+# Instances that are the same up to a symmetry share one entry. A queens board is turned by the
+# 8 symmetries of the square (those that still leave at most one queen per column) and the
+# smallest result is its key. A sliding puzzle is turned the same way together with its goal, and
+# its tiles are then renamed after their squares in the turned goal, so puzzles with different
+# goals that are the same up to tile names and symmetry share a key too. The stored goal state is
+# turned back for the instance that asks for it.
+#
+# The cache is a SQLite database in write-ahead logging mode, so any number of processes read it
+# while another one writes. It holds at most max_entries instances, evicting the least recently
+# used ones.
+#
+#   cache = SolutionCache()
+#   state = cache.solve(eightpuzzle.simulated_annealing, EightPuzzle((1, 2, 5, 3, 4, 0, 6, 7, 8)))
+
+def default_path():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solution_cache.sqlite')
+
+# The 8 symmetries of a size x size board, as pairs of lists (the square every square goes to,
+# the square every square comes from). The first one is the identity.
+@lru_cache(maxsize=None)
+def board_symmetries(size):
+    symmetries = []
+    for transpose in (False, True):
+        for flip_rows in (False, True):
+            for flip_columns in (False, True):
+                moves = []
+                for i in range(size * size):
+                    row, column = divmod(i, size)
+                    if transpose:
+                        row, column = column, row
+                    if flip_rows:
+                        row = size - 1 - row
+                    if flip_columns:
+                        column = size - 1 - column
+                    moves.append(row * size + column)
+                sources = [0] * len(moves)
+                for i, j in enumerate(moves):
+                    sources[j] = i
+                symmetries.append((moves, sources))
+    return symmetries
+
+def turn_queens(state, moves):
+    """ The queens state with the queen of every square moved to moves[square], or None if that
+    puts two queens in a column """
+    n = len(state)
+    turned = [-1] * n
+    for column, row in enumerate(state):
+        if row >= 0:
+            row, column = divmod(moves[row * n + column], n)
+            if turned[column] != -1:
+                return None
+            turned[column] = row
+    return tuple(turned)
+
+def queens_instance(problem):
+    best = None
+    for moves, sources in board_symmetries(problem.N):
+        turned = turn_queens(problem.initial, moves)
+        if turned is not None and (best is None or turned < best[0]):
+            best = (turned, moves, sources)
+    turned, moves, sources = best
+    return ('queens:{}:{}'.format(problem.N, ','.join(map(str, turned))),
+            lambda state: turn_queens(state, moves),
+            lambda stored: turn_queens(stored, sources))
+
+def puzzle_instance(problem, initial, goal):
+    """ Renaming the tiles also renames the blank, so the key holds the blank's new name as well:
+    without it puzzles that differ in which tile is the blank, one of them maybe unsolvable,
+    would share a key.
+    >>> key = lambda initial, goal: canonical(eightpuzzle.EightPuzzle(initial, goal))[0]
+    >>> key((8, 6, 7, 2, 3, 0, 4, 5, 1), (0, 1, 5, 7, 8, 2, 4, 6, 3))
+    'puzzle:3:0:4,7,2,5,8,6,1,0,3'
+    >>> key((5, 7, 0, 8, 2, 4, 6, 3, 1), (5, 1, 3, 4, 0, 6, 2, 7, 8))
+    'puzzle:3:4:0,7,4,8,6,3,5,2,1'
+    """
+    size = math.isqrt(len(goal))
+    best = None
+    for moves, sources in board_symmetries(size):
+        turned_goal = [goal[i] for i in sources]
+        name = {tile: square for square, tile in enumerate(turned_goal)}
+        renamed = (name[0],) + tuple(name[initial[i]] for i in sources)
+        if best is None or renamed < best[0]:
+            best = (renamed, moves, sources, turned_goal, name)
+    renamed, moves, sources, turned_goal, name = best
+    return ('puzzle:{}:{}:{}'.format(size, renamed[0], ','.join(map(str, renamed[1:]))),
+            lambda state: tuple(name[state[i]] for i in sources),
+            lambda stored: tuple(turned_goal[stored[j]] for j in moves))
+
+def canonical(problem):
+    """ Return (key, encode, decode) for problem's instance, where encode turns a state of the
+    problem into the canonical instance's and decode turns one back, or None if the problem
+    isn't one the cache knows """
+    if isinstance(problem, eightqueens.NQueensProblem):
+        return queens_instance(problem)
+    if isinstance(problem, eightpuzzle.PackedEightPuzzle):
+        key, encode, decode = puzzle_instance(problem, eightpuzzle.unpack(problem.initial),
+                                              eightpuzzle.unpack(problem.goal))
+        return key, lambda state: encode(eightpuzzle.unpack(state)), lambda stored: problem.pack(decode(stored))
+    if isinstance(problem, (eightpuzzle.EightPuzzle, slidingpuzzle.SlidingPuzzle)):
+        return puzzle_instance(problem, problem.initial, problem.goal)
+    return None
+
+class SolutionCache:
+    """ Cache of solved instances in the SQLite database at path (default: default_path()),
+    created if it doesn't exist. At most max_entries instances are kept. Lookups remember the
+    instances they used and write that down every touch_every hits (and on flush and close),
+    so reads don't have to wait for the database lock """
+
+    def __init__(self, path=None, max_entries=100000, touch_every=100):
+        self.path = path or default_path()
+        self.max_entries = max_entries
+        self.touch_every = touch_every
+        self.hits = 0
+        self.misses = 0
+        self.touched = {}
+        # Autocommit: every statement is its own transaction
+        self.connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS solutions '
+                                '(key TEXT PRIMARY KEY, state TEXT NOT NULL, used REAL NOT NULL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    def lookup(self, instance):
+        """ The state stored for instance (a result of canonical), turned back for it, or None """
+        key, _, decode = instance
+        row = self.connection.execute('SELECT state FROM solutions WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.touched[key] = time.time()
+        if len(self.touched) >= self.touch_every:
+            self.flush()
+        return decode(json.loads(row[0]))
+
+    def store(self, instance, state):
+        """ Store the goal state state of instance, then evict the least recently used
+        instances beyond max_entries """
+        key, encode, _ = instance
+        self.touched.pop(key, None)
+        with self.connection:
+            self.connection.execute('BEGIN IMMEDIATE')
+            self.connection.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)',
+                                    (key, json.dumps(encode(state)), time.time()))
+            self.connection.execute('DELETE FROM solutions WHERE key IN (SELECT key FROM solutions '
+                                    'ORDER BY used LIMIT MAX(0, (SELECT COUNT(*) FROM solutions) - ?))',
+                                    (self.max_entries,))
+
+    def get(self, problem):
+        """ A goal state of problem's instance if it's in the cache, else None """
+        instance = canonical(problem)
+        return None if instance is None else self.lookup(instance)
+
+    def put(self, problem, state):
+        """ Store state for problem's instance if it's a goal state """
+        instance = canonical(problem)
+        if instance is not None and problem.goal_test(state):
+            self.store(instance, state)
+
+    def solve(self, solver, problem, *args, **kwargs):
+        """ Return solver(problem, *args, **kwargs), or the cached goal state without calling
+        the solver if the instance has been solved before. Goal states the solver finds are
+        stored. The key is taken before the solver runs, as some solvers change problem.initial """
+        instance = canonical(problem)
+        if instance is None:
+            return solver(problem, *args, **kwargs)
+        state = self.lookup(instance)
+        if state is None:
+            state = solver(problem, *args, **kwargs)
+            if problem.goal_test(state):
+                self.store(instance, state)
+        return state
+
+    def flush(self):
+        """ Write down when the instances looked up since the last flush were last used """
+        if self.touched:
+            with self.connection:
+                self.connection.execute('BEGIN IMMEDIATE')
+                self.connection.executemany('UPDATE solutions SET used = MAX(used, ?) WHERE key = ?',
+                                            [(used, key) for key, used in self.touched.items()])
+            self.touched = {}
+
+    def close(self):
+        self.flush()
+        self.connection.close()
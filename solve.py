@@ -0,0 +1,55 @@
+import argparse
+import sys
+
+import benchmark
+import pipeline
+
+# Command line interface for the solvers.
+#   python solve.py batch --problem eightpuzzle --algorithm annealing < puzzles.jsonl > results.jsonl
+#   python solve.py bench --trials 1000 --baseline report.json
+
+def batch(args):
+    lines = sys.stdin if args.input == '-' else open(args.input)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        records = pipeline.solve_stream(lines, args.problem, args.algorithm, args.workers,
+                                        args.in_flight, args.seed, args.stats, args.cache)
+        pipeline.write_results(records, output)
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+        if output is not sys.stdout:
+            output.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve eight puzzle and N-queens instances with local search')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_batch = commands.add_parser('batch', help='solve a stream of JSON line instances')
+    parser_batch.add_argument('--problem', choices=sorted(pipeline.ALGORITHMS), default='eightpuzzle')
+    parser_batch.add_argument('--algorithm', default='annealing',
+                              help='steepest, first-choice, random-restart, annealing, tabu or (queens only) min-conflicts')
+    parser_batch.add_argument('--input', default='-', help='JSON lines file of instances (default: stdin)')
+    parser_batch.add_argument('--output', default='-', help='JSON lines file of results (default: stdout)')
+    parser_batch.add_argument('--workers', type=int, default=None, help='worker processes (default: one per core)')
+    parser_batch.add_argument('--in-flight', type=int, default=None,
+                              help='maximum number of instances being solved at once (default: 4 per worker)')
+    parser_batch.add_argument('--seed', type=int, default=0, help='base seed of the random number generators')
+    parser_batch.add_argument('--stats', action='store_true',
+                              help='add per-instance counters, phase timings and acceptance traces to the results')
+    parser_batch.add_argument('--cache', default=None,
+                              help='solution cache database: reuse the solutions stored in it and store new ones')
+    parser_batch.set_defaults(run=batch)
+
+    parser_bench = commands.add_parser('bench', help='run the benchmark suite')
+    benchmark.add_arguments(parser_bench)
+    parser_bench.set_defaults(run=benchmark.run)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.run(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# Opt-in memoization of the heuristics. h and value are pure functions of the state, but the
+# solvers evaluate the same states again and again: the current state on every iteration, states
+# revisited across restarts, annealing moves back and forth. MemoizedProblem wraps any problem so
+# that h and value are looked up in bounded transposition tables first, and only computed for
+# states that aren't in them.
+#
+#   problem = MemoizedProblem(EightPuzzle(initial), max_entries=100000)
+#   state = random_restart_hill_climbing(problem)
+#   problem.h_table.hits, problem.h_table.misses
+
+class TranspositionTable:
+    """ Map from states to their values holding at most max_entries of them. When it's full a
+    new entry replaces one chosen by the clock algorithm: a hand sweeps the slots in a circle,
+    clearing the reference bit of every slot used since the hand last passed it, and stops at
+    the first one that wasn't used. Values must not be None """
+
+    def __init__(self, max_entries=1 << 16):
+        self.max_entries = max(1, max_entries)
+        self.slots = {}
+        self.keys = []
+        self.values = []
+        self.referenced = bytearray(self.max_entries)
+        self.hand = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def get(self, key):
+        """ The value stored for key, or None """
+        slot = self.slots.get(key)
+        if slot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.referenced[slot] = 1
+        return self.values[slot]
+
+    def put(self, key, value):
+        if len(self.keys) < self.max_entries:
+            slot = len(self.keys)
+            self.keys.append(key)
+            self.values.append(value)
+        else:
+            referenced, hand = self.referenced, self.hand
+            while referenced[hand]:
+                referenced[hand] = 0
+                hand = (hand + 1) % self.max_entries
+            slot = hand
+            self.hand = (hand + 1) % self.max_entries
+            del self.slots[self.keys[slot]]
+            self.keys[slot] = key
+            self.values[slot] = value
+            self.evictions += 1
+        # New entries start unreferenced, so states looked up only once are replaced first
+        self.referenced[slot] = 0
+        self.slots[key] = slot
+
+    def as_dict(self):
+        return {'entries': len(self.slots), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions}
+
+class MemoizedProblem:
+    """ Wraps a problem so that h and value are computed once per state held in the tables
+    h_table and value_table (TranspositionTables of max_entries states each). Everything else
+    goes straight to the wrapped problem, like InstrumentedProblem """
+
+    def __init__(self, problem, max_entries=1 << 16):
+        self.problem = problem
+        self.h_table = TranspositionTable(max_entries)
+        self.value_table = TranspositionTable(max_entries)
+
+    def __getattr__(self, name):
+        # problem itself is looked up here while a copy or an unpickled wrapper is being built
+        if name == 'problem':
+            raise AttributeError(name)
+        attribute = getattr(self.problem, name)
+        # Methods are kept, so that the solvers' calls don't come through here every time
+        if callable(attribute):
+            self.__dict__[name] = attribute
+        return attribute
+
+    def h(self, node):
+        value = self.h_table.get(node.state)
+        if value is None:
+            value = self.problem.h(node)
+            self.h_table.put(node.state, value)
+        return value
+
+    def value(self, state):
+        """ problem.value(state), where state may be a node (the queens take one) """
+        key = getattr(state, 'state', state)
+        value = self.value_table.get(key)
+        if value is None:
+            value = self.problem.value(state)
+            self.value_table.put(key, value)
+        return value
+
+    def as_dict(self):
+        return {'h': self.h_table.as_dict(), 'value': self.value_table.as_dict()}
@@ -0,0 +1,92 @@
+import math
+
+import eightpuzzle
+import slidingpuzzle
+
+# Memory-bounded sets of visited states for random restart hill climbing. A climb that enters a
+# state an earlier climb went through would mostly repeat the rest of that climb and end on a
+# local optimum already found, so random_restart_hill_climbing(problem, visited=...) cuts it short
+# and counts it under stats.counters['saved_restarts'].
+# Bitset is exact, with one bit per state of a perfect hash (the rank of a puzzle's permutation,
+# or the board read as a number in base N + 1); BloomFilter fits any number of states in a fixed
+# number of bits, at the price of sometimes taking a new state for a visited one.
+
+class Bitset:
+    """ Exact set of states, where index(state) maps the states to distinct integers below size """
+
+    def __init__(self, size, index):
+        self.bits = bytearray((size + 7) // 8)
+        self.index = index
+        self.count = 0
+
+    def add(self, state):
+        """ Add state, returning whether it was already in the set """
+        i = self.index(state)
+        byte, bit = i >> 3, 1 << (i & 7)
+        if self.bits[byte] & bit:
+            return True
+        self.bits[byte] |= bit
+        self.count += 1
+        return False
+
+class BloomFilter:
+    """ Approximate set of states in a fixed number of bits (rounded up to a power of 2), each
+    state setting hashes of them. add may answer True for a state that wasn't added, more often
+    as the filter fills up; for n states the chance is about (1 - exp(-hashes * n / bits)) ** hashes """
+
+    def __init__(self, bits=1 << 23, hashes=3):
+        self.mask = (1 << (bits - 1).bit_length()) - 1
+        self.bits = bytearray((self.mask + 1) // 8 or 1)
+        self.hashes = hashes
+        self.count = 0
+
+    def add(self, state):
+        """ Add state, returning whether it was (probably) already in the set """
+        h = hash(state)
+        # Double hashing: the i-th bit is h1 + i * h2
+        h1, h2 = h & 0xffffffff, ((h >> 32) & 0xffffffff) | 1
+        bits, mask = self.bits, self.mask
+        seen = True
+        for i in range(self.hashes):
+            j = (h1 + i * h2) & mask
+            byte, bit = j >> 3, 1 << (j & 7)
+            if not bits[byte] & bit:
+                bits[byte] |= bit
+                seen = False
+        self.count += not seen
+        return seen
+
+def permutation_rank(state):
+    """ Position of the permutation state in the lexicographic order of the permutations of its tiles """
+    rank = 0
+    n = len(state)
+    for i, tile in enumerate(state):
+        smaller = tile
+        for previous in state[:i]:
+            if previous < tile:
+                smaller -= 1
+        rank = rank * (n - i) + smaller
+    return rank
+
+def board_index(state):
+    """ The queens board state (rows from -1 for an empty column to N - 1) read as a number in base N + 1 """
+    base = len(state) + 1
+    index = 0
+    for row in state:
+        index = index * base + row + 1
+    return index
+
+def packed_rank(state):
+    """ permutation_rank of a PackedEightPuzzle state's board """
+    return permutation_rank(eightpuzzle.unpack(state))
+
+def default_filter(problem, max_bits=1 << 27):
+    """ An exact Bitset for the states of problem if it takes at most max_bits bits (the eight
+    puzzle's 9! states, packed ones too, queens boards up to N = 8), else a BloomFilter """
+    if isinstance(problem, eightpuzzle.PackedEightPuzzle):
+        return Bitset(math.factorial(9), packed_rank)
+    if isinstance(problem, (eightpuzzle.EightPuzzle, slidingpuzzle.SlidingPuzzle)):
+        size = math.factorial(len(problem.goal))
+        return Bitset(size, permutation_rank) if size <= max_bits else BloomFilter()
+    size = (problem.N + 1) ** problem.N
+    return Bitset(size, board_index) if size <= max_bits else BloomFilter()